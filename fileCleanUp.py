@@ -26,7 +26,7 @@ import os
 # #Get path to home directory
 # HOME = os.path.expanduser('~')
 # sys.path.append('{}/lib/python'.format(HOME))
-from mypylib.lutil import cmd, OrderedGlob
+from mypylib.lutil import cmd, OrderedGlob, FileSeries
 
 # dryrun = False
 
@@ -157,11 +157,11 @@ class Deletor():
         #glob pattern that would match ALL files of this form, not just this series (use to bound large ranges)
             #match single digit and multiple digit while excluding wildcard file extensions
         # ii = OrderedGlob("{}/{}.[0-9]{}  {}/{}.[0-9]*[0-9]{}".format(self.path, self.head, self.tail, self.path, self.head, self.tail) )['match'].values
-        allfiles = OrderedGlob("{}/{}.[0-9]*[0-9]{}".format(self.path, self.head, self.tail) ) #doesnt catch single digits, but oh well that's just 10
+        allfiles = FileSeries("{}/{}.[0-9]*[0-9]{}".format(self.path, self.head, self.tail), engine='index') #doesnt catch single digits, but oh well that's just 10
         nfiles = len(allfiles)
         if nfiles > 0:
-            ii = allfiles['match'].values
-            imin, imax = min(ii), max(ii)
+            #series is sorted, so bounds are the endpoints
+            imin, imax = allfiles.match[0], allfiles.match[-1]
             ii = np.array(iterstodelete)
             ii = ii[ii>=imin]
             ii = ii[ii<=imax]
@@ -7,7 +7,8 @@ MODIFIED: 01 OCT 2020
 quickly plot a glob of files
 
 USAGE:
-Command-line: globplot header x y
+Command-line: globplot header x y [-c]
+    (-c to cache parsed files as binary, so replotting large files is fast)
 Add to path: ln -s globplot.py ~/bin/globplot
 
 ToDo:
@@ -19,8 +20,10 @@ import numpy as np
 import pandas as pd
 import glob
 
+from mypylib.lutil import CachedRead
 
-def main(header, x, y, sep=' '):
+
+def main(header, x, y, sep=' ', cache=False):
 
     files = glob.glob('{}*'.format(header))
     #case name will be all text after header (minus file extension)
@@ -50,7 +53,7 @@ def main(header, x, y, sep=' '):
     plt.figure()
 
     for f, n in zip(p.files,p.names):
-        df = pd.read_csv(f, sep=sep)
+        df = CachedRead(f, lambda p: pd.read_csv(p, sep=sep), cache=cache, options='globplot {}'.format(sep))
         plt.plot(df[x], df[y], label=n)
 
 
@@ -80,7 +83,10 @@ if __name__ == "__main__":
         )
     parser.add_argument('x', type=str, help="Key for x-axis")
     parser.add_argument('y', type=str, help="Key for y-axis")
+    parser.add_argument('-c', '--cache', action='store_true',
+            help="Cache parsed files in binary format (see `lutil.CachedRead`)"
+        )
 
     args = parser.parse_args()
 
-    main(header=args.header, x=args.x, y=args.y,)
+    main(header=args.header, x=args.x, y=args.y, cache=args.cache)
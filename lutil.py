@@ -12,6 +12,18 @@ import errno
 import re
 import ntpath
 import inspect
+import functools
+import itertools
+import collections
+import fnmatch
+import hashlib
+import mmap
+import io
+import zipfile
+import pickle
+import time
+import atexit
+import weakref
 # import matplotlib.pyplot as plt
 import numpy as np
 from scipy.interpolate import interp1d
@@ -179,24 +191,27 @@ def FindBetween(string, before=None, after=None):
     before --> [default: beginning of line]
     after  --> [default: end of line]
     """
+    match = FindBetweenRegex(before, after).search(string)
+    if match is not None:
+        return match.group('value')
+    else:
+        return None
+
+@functools.lru_cache(maxsize=128)
+def FindBetweenRegex(before=None, after=None):
+    """Compiled regex used by `FindBetween` (cached, so it is only built once per `before`/`after` pair).
+    Use to search many strings for the same pattern: `FindBetweenRegex(before, after).search(string).group('value')`
+    """
     if before is None: before = '^' #default is beginning of line
-    before = before.replace("(", "\(").replace(")", "\)") #make matching parentheses work
+    before = before.replace("(", "\\(").replace(")", "\\)") #make matching parentheses work
 
     if after is None:
         #return everything after `before`
-        match = re.search('{}(.*)$'.format(before), string)
-        if match != None:
-            return match.group(1)
-        else:
-            return None
+        return re.compile('{}(?P<value>.*)$'.format(before))
     else:
         #return text between `before` and `after`
-        after = after.replace("(", "\(").replace(")", "\)")
-        match = re.search('(?<={})(?P<value>.*?)(?={})'.format(before, after), string)
-        if match is not None:
-            return match.group('value')
-        else:
-            return None
+        after = after.replace("(", "\\(").replace(")", "\\)")
+        return re.compile('(?<={})(?P<value>.*?)(?={})'.format(before, after))
 
 def str2numeric(string):
     """convert string to int or float, if appropriate
@@ -234,22 +249,32 @@ def listify(nonlist, n=1):
         outlist = nonlist
     return outlist
 
-def OrderedGlob(globpattern=None, header=None):
+def OrderedGlob(globpattern=None, header=None, engine=None):
     """ Glob all files in cwd with provided glob pattern or: "ls header.*"
     Return DataFrame with file list ordered by * match converted to float/int
     Args:
         globpattern: str containing a wildcard character like `*`, `[0-9]`, etc
+                        (multiple space-separated patterns are globbed separately, then combined)
         header: backwards compatibility, same as `globpattern
+        engine: 'scandir' reads each directory once with `os.scandir` and matches every pattern with precompiled regexes,
+                'index' same as 'scandir', but keeps a persistent `GlobIndex` of each directory so repeat calls only
+                        process files added/removed since the last call (use for big series that are globbed repeatedly),
+                'glob' is the original `glob`+`FindBetween` implementation ['scandir']
     Returns:
-        pd.DataFrame({'file','match'})
+        pd.DataFrame({'file','match','tail'})
     """
     #backwards compatible
     if header is not None and globpattern is None: globpattern = header
     #Manage inputs
     if globpattern is None:
         raise IOError("Usage: OrderedGlob(globpattern) -> glob(globpattern) -> return df{['file', 'match']}")
+    if engine is None: engine = 'scandir'
+    if engine not in ['scandir', 'index', 'glob']:
+        raise ValueError("OrderedGlob engine must be 'scandir', 'index', or 'glob', not '{}'".format(engine))
     #handle multiple glob patterns separately, then combine at the end
     globpatterns = globpattern.split()
+    listings = {} #directory contents, so each directory is only read once for all patterns
+    indices = {} #directory indices, so each directory is only checked once for all patterns
     dfs = []
     for gp in globpatterns:
         if "*" not in gp:
@@ -261,95 +286,910 @@ def OrderedGlob(globpattern=None, header=None):
         elif len(gp.split("*")) > 3:
             raise ValueError("'{}': I don't know how to handle globs with more than two wildcards (*) ".format(gp))
 
-        from glob import glob
-        files = glob(gp)
-        #return empty DF if no files globbed
-        if len(files) < 1:
-            # return pd.DataFrame(columns=['file','match','tail'])
-            dfs.append( pd.DataFrame(columns=['file','match','tail']) )
-            continue
-
-        #get glob match for each file
-            #(remove boilerplate portion of the glob pattern, and delete any wildcards in square brackets (e.g. `[0-9]`) )
-            #if filename is a path, dont bother matching the path, just the filename+extension (`ntpath.basename`)
-        pattern = re.sub( "\[.*?\]", "", ntpath.basename(gp)).split("*")
-        #if string on one side of '*' is empty, use `None` so `FindBetween` will match default (beginning/end of string)
-        for i, x in enumerate(pattern):
-            if x == '': pattern[i] = None
-
-        if len(pattern) == 1:
-            #No wildcard, just strip the glob boilerplate
-            match = [ ntpath.basename(f).replace() for f in files] #dont search full paths, just the filename
-
-            #get numeric match for one-wildcard glob pattern
-            match = [ FindBetween(ntpath.basename(f), pattern[0], pattern[1]) for f in files] #dont search full paths, just the filename
-            #convert strings to numbers
-            isnum = [i.isnumeric() for i in match]
-            if any(isnum) and not all(isnum): raise ValueError("Not all matches are numeric, glob pattern is ambiguous")
-            if isnum[0]: match = [str2numeric(i) for i in match]
-        elif len(pattern) == 2:
-            #get numeric match for one-wildcard glob pattern
-            match = [ FindBetween(ntpath.basename(f), pattern[0], pattern[1]) for f in files] #dont search full paths, just the filename
-            #convert strings to numbers
-            isnum = [i.isnumeric() for i in match]
-            if any(isnum) and not all(isnum): raise ValueError("Not all matches are numeric, glob pattern is ambiguous")
-            if isnum[0]: match = [str2numeric(i) for i in match]
-
-        elif len(pattern) == 3:
-            #get numeric match for two-wildcard glob pattern, assuming only one of two is numeric
-
-            match = []
-            for f in files:
-                #trim off the head and tail of the filename, and match both wildcards
-                    # (e.g. `q.*.[0-9]*[0-9].triq` + `q.y0.009999.triq` = ['y0', '009999'])
-                    # dont search full paths, just the filename
-                # match = [ FindBetween(GetFilename(f), pattern[0], pattern[-1]).split(pattern[1]) for f in match]
-                matchs = FindBetween(ntpath.basename(f), pattern[0], pattern[-1]).split(pattern[1])
-                #determine which wildcard match is the numeric one
-                isnum = [m.isnumeric() for m in matchs]
-                if any(isnum) and not all(isnum):
-                    for n, b in zip(matchs, isnum):
-                        if b: num = str2numeric(n)
-                else:
-                    raise ValueError("{}: Either no numeric matches or two. There can only be one numeric match for OrderedGlob".format(f))
-                match.append(num)
-
-        #'TAILS' IS FOR COMPATIBILITY
-        df = pd.DataFrame({'file':files, 'match':match, 'tail':match}).sort_values('match')
+        if engine == 'scandir' and _ScandirGlobable(gp):
+            df = _OrderedGlobScandir(gp, listings)
+        elif engine == 'index' and _ScandirGlobable(gp):
+            df = _OrderedGlobIndexed(gp, indices)
+        else:
+            df = _OrderedGlobGlob(gp)
         dfs.append(df)
+    #save updated directory indices for next time
+    for index in indices.values(): index.Save()
 
     df = pd.concat(dfs, ignore_index=True)
     return df
 
-def parallelizer(inp=None, func=None, nproc=1):
+def _OrderedGlobPattern(gp):
+    """ Split glob pattern `gp` into the boilerplate text on either side of its wildcard(s) (`None` for an empty side)
+    (remove boilerplate portion of the glob pattern, and delete any wildcards in square brackets (e.g. `[0-9]`) )
+    (if filename is a path, dont bother matching the path, just the filename+extension (`ntpath.basename`))
+    """
+    pattern = re.sub( r"\[.*?\]", "", ntpath.basename(gp)).split("*")
+    #if string on one side of '*' is empty, use `None` so `FindBetween` will match default (beginning/end of string)
+    for i, x in enumerate(pattern):
+        if x == '': pattern[i] = None
+    return pattern
+
+def _ScandirGlobable(gp):
+    """ True if glob pattern `gp` can be handled by the `os.scandir` engine of `OrderedGlob`
+    (wildcards only in the filename, not in the directory path)
+    """
+    return re.search('[*?[]', os.path.dirname(gp)) is None and len(_OrderedGlobPattern(gp)) in [2, 3]
+
+def _OrderedGlobScandir(gp, listings=None):
+    """ `OrderedGlob` engine for a single glob pattern `gp`: list its directory once with `os.scandir`,
+    then filter and match every filename with one precompiled regex each.
+    listings: dict of {directory: newline-joined filenames} shared between patterns, so a directory is only read once
+    """
+    if listings is None: listings = {}
+    dirname = os.path.dirname(gp)
+    #READ DIRECTORY (ONCE)
+    if dirname not in listings: listings[dirname] = '\n'.join(_ListDir(dirname))
+    files, match = _GlobListing(listings[dirname], gp)
+    #return empty DF if no files globbed
+    if len(files) < 1:
+        return pd.DataFrame(columns=['file','match','tail'])
+    #SORT BY MATCH
+    isort = np.argsort(match, kind='stable')
+    files, match = files[isort], match[isort]
+    #'TAILS' IS FOR COMPATIBILITY
+    return pd.DataFrame({'file':files, 'match':match, 'tail':match})
+
+def _ListDir(dirname):
+    """ List of filenames in directory `dirname` (cwd if empty) with `os.scandir` (empty if directory does not exist)
+    """
+    try:
+        with os.scandir(dirname if dirname else os.curdir) as it:
+            return [entry.name for entry in it]
+    except OSError:
+        return []
+
+def _GlobListing(listing, gp):
+    """ Filter and match a directory listing against glob pattern `gp` with one precompiled regex each
+    (regexes are run over the newline-joined listing, so the per-file loop happens inside `re`, not in python)
+    Args:
+        listing: newline-joined filenames in the directory of `gp`
+        gp: glob pattern with wildcards in filename only
+    Returns:
+        files: unsorted object array of globbed file paths
+        match: corresponding array of glob matches (int64, float64, or str)
+    """
+    dirname, basename = os.path.split(gp)
+    #FILTER FILENAMES BY GLOB PATTERN
+    names = _GlobLineRegex(basename).findall(listing)
+    if len(names) < 1:
+        return np.array([], dtype=object), np.array([], dtype=np.int64)
+
+    #GET GLOB MATCH FOR EACH FILE
+    pattern = _OrderedGlobPattern(gp)
+    if len(pattern) == 2:
+        #get numeric match for one-wildcard glob pattern
+        match = _FindBetweenLineRegex(pattern[0], pattern[1]).findall('\n'.join(names))
+        if len(match) != len(names): raise ValueError("'{}': glob matched files that its boilerplate text does not".format(gp))
+        match = _NumericMatches(match)
+    else:
+        #get numeric match for two-wildcard glob pattern, assuming only one of two is numeric
+        matches = _FindBetweenLineRegex(pattern[0], pattern[-1]).findall('\n'.join(names))
+        if len(matches) != len(names): raise ValueError("'{}': glob matched files that its boilerplate text does not".format(gp))
+        match = []
+        for n, m in zip(names, matches):
+            #trim off the head and tail of the filename, and match both wildcards
+                # (e.g. `q.*.[0-9]*[0-9].triq` + `q.y0.009999.triq` = ['y0', '009999'])
+            #determine which wildcard match is the numeric one
+            matchs = m.split(pattern[1])
+            nums = [x for x in matchs if x.isnumeric()]
+            if len(nums) == 0 or len(nums) == len(matchs):
+                raise ValueError("{}: Either no numeric matches or two. There can only be one numeric match for OrderedGlob".format(n))
+            match.append(nums[-1])
+        match = np.fromiter(map(int, match), dtype=np.int64, count=len(match))
+
+    if dirname: names = [os.path.join(dirname, n) for n in names]
+    return np.array(names, dtype=object), match
+
+@functools.lru_cache(maxsize=128)
+def _GlobLineRegex(basename):
+    """ Compiled multiline regex that finds every line (filename) of a newline-joined directory listing matching glob pattern `basename`
+    (like `glob`, hidden files only match patterns that explicitly start with '.')
+    """
+    #`fnmatch` regex is '(?s:BODY)\Z', drop dotall so wildcards cannot run past the end of a line
+    body = fnmatch.translate(basename)
+    body = body[body.index(':')+1:body.rindex(')')]
+    body = re.sub(r'(?<!\\)\[\^', r'[^\\n', body) #negated character classes shouldnt match newlines either
+    hidden = '' if basename[0] == '.' else r'(?!\.)'
+    return re.compile(r'^{}(?:{})$'.format(hidden, body), re.MULTILINE)
+
+@functools.lru_cache(maxsize=128)
+def _FindBetweenLineRegex(before=None, after=None):
+    """ Compiled multiline version of `FindBetweenRegex`, returns the `FindBetween` match of every line in a newline-joined string with `findall`
+    """
+    if before is None: before = '^' #default is beginning of line
+    before = before.replace("(", "\\(").replace(")", "\\)") #make matching parentheses work
+    if after is None:
+        #return everything after `before`
+        return re.compile('^.*?{}(.*)$'.format(before), re.MULTILINE)
+    else:
+        #return text between `before` and `after`
+        after = after.replace("(", "\\(").replace(")", "\\)")
+        return re.compile('^.*?{}(.*?){}'.format(before, after), re.MULTILINE)
+
+def _NumericMatches(match):
+    """ Convert list of glob match strings to an int64 array if they are all integers,
+    float64 if they are all decimal numbers, otherwise leave them as strings
+    """
+    if all(match) and ''.join(match).isnumeric():
+        return np.fromiter(map(int, match), dtype=np.int64, count=len(match))
+    elif any(m.isnumeric() for m in match):
+        raise ValueError("Not all matches are numeric, glob pattern is ambiguous")
+    try:
+        return np.fromiter(map(float, match), dtype=np.float64, count=len(match))
+    except ValueError:
+        return np.array(match, dtype=object)
+
+def _OrderedGlobGlob(gp):
+    """ Original `OrderedGlob` engine for a single glob pattern `gp`, using `glob` and `FindBetween`
+    """
+    from glob import glob
+    files = glob(gp)
+    #return empty DF if no files globbed
+    if len(files) < 1:
+        # return pd.DataFrame(columns=['file','match','tail'])
+        return pd.DataFrame(columns=['file','match','tail'])
+
+    #get glob match for each file
+    pattern = _OrderedGlobPattern(gp)
+
+    if len(pattern) == 1:
+        #No wildcard, just strip the glob boilerplate
+        match = [ ntpath.basename(f).replace() for f in files] #dont search full paths, just the filename
+
+        #get numeric match for one-wildcard glob pattern
+        match = [ FindBetween(ntpath.basename(f), pattern[0], pattern[1]) for f in files] #dont search full paths, just the filename
+        #convert strings to numbers
+        isnum = [i.isnumeric() for i in match]
+        if any(isnum) and not all(isnum): raise ValueError("Not all matches are numeric, glob pattern is ambiguous")
+        if isnum[0]: match = [str2numeric(i) for i in match]
+    elif len(pattern) == 2:
+        #get numeric match for one-wildcard glob pattern
+        match = [ FindBetween(ntpath.basename(f), pattern[0], pattern[1]) for f in files] #dont search full paths, just the filename
+        #convert strings to numbers
+        isnum = [i.isnumeric() for i in match]
+        if any(isnum) and not all(isnum): raise ValueError("Not all matches are numeric, glob pattern is ambiguous")
+        if isnum[0]: match = [str2numeric(i) for i in match]
+
+    elif len(pattern) == 3:
+        #get numeric match for two-wildcard glob pattern, assuming only one of two is numeric
+
+        match = []
+        for f in files:
+            #trim off the head and tail of the filename, and match both wildcards
+                # (e.g. `q.*.[0-9]*[0-9].triq` + `q.y0.009999.triq` = ['y0', '009999'])
+                # dont search full paths, just the filename
+            # match = [ FindBetween(GetFilename(f), pattern[0], pattern[-1]).split(pattern[1]) for f in match]
+            matchs = FindBetween(ntpath.basename(f), pattern[0], pattern[-1]).split(pattern[1])
+            #determine which wildcard match is the numeric one
+            isnum = [m.isnumeric() for m in matchs]
+            if any(isnum) and not all(isnum):
+                for n, b in zip(matchs, isnum):
+                    if b: num = str2numeric(n)
+            else:
+                raise ValueError("{}: Either no numeric matches or two. There can only be one numeric match for OrderedGlob".format(f))
+            match.append(num)
+
+    #'TAILS' IS FOR COMPATIBILITY
+    df = pd.DataFrame({'file':files, 'match':match, 'tail':match}).sort_values('match')
+    return df
+
+#location of persistent caches (e.g. `OrderedGlob` directory indices), override with environment variable `LUTIL_CACHEDIR`
+CACHEDIR = os.environ.get('LUTIL_CACHEDIR', os.path.join(os.path.expanduser('~'), '.cache', 'mypylib'))
+
+class GlobIndex():
+    """ Persistent, incrementally updated index of the file series in one directory (used by `OrderedGlob(engine='index')`)
+
+    Keyed on directory mtime: if the directory hasn't changed since the last snapshot, the stored sorted
+    (match, file) arrays for each glob pattern are returned without reading the directory.
+    Otherwise, the directory is listed once and only the filenames added or removed since the snapshot are
+    matched and merged into (or dropped from) each indexed glob pattern.
+    Indices are kept in memory for the life of the process and pickled to `CACHEDIR/orderedglob` between processes.
+    (Get with `GetGlobIndex` instead of initializing directly)
+    """
+
+    #directory changes within this many seconds of a snapshot might not change its (coarse) mtime, so dont trust it
+    racytime = 2.0
+
+    def __init__(self, path):
+        """ Initialize empty index
+        Args:
+            path: absolute path to indexed directory
+        """
+        self.path = path
+        self.mtime = None #directory mtime of last snapshot (None to force a rescan)
+        self.names = set() #directory contents at last snapshot
+        self.series = {} #{glob pattern : (files, match)}, sorted by match
+        self.modified = False #needs to be saved
+
+    def IndexFile(self):
+        """ Path to on-disk copy of this index
+        """
+        return os.path.join(CACHEDIR, 'orderedglob', '{}.pkl'.format(hashlib.sha1(self.path.encode()).hexdigest()))
+
+    def Update(self):
+        """ Rescan directory if it has changed since last snapshot, then add/remove only the changed files from each indexed glob pattern
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is not None and mtime == self.mtime: return
+
+        names = set(_ListDir(self.path))
+        added   = names - self.names
+        removed = self.names - names
+        for gp in list(self.series):
+            self._Apply(gp, added, removed)
+        self.names = names
+        #only trust mtime if directory hasnt been changed too recently to tell
+        if mtime is not None and time.time() - mtime*1e-9 < self.racytime: mtime = None
+        if len(added) > 0 or len(removed) > 0 or mtime != self.mtime: self.modified = True
+        self.mtime = mtime
+
+    def _Apply(self, gp, added, removed):
+        """ Drop `removed` and merge `added` filenames into sorted index of glob pattern `gp`
+        """
+        files, match = self.series[gp]
+        dirname = os.path.dirname(gp)
+        #DROP REMOVED FILES
+        if len(removed) > 0 and len(files) > 0:
+            if dirname: removed = [os.path.join(dirname, n) for n in removed]
+            keep = ~pd.Index(files).isin(list(removed))
+            files, match = files[keep], match[keep]
+        #MERGE ADDED FILES
+        newfiles, newmatch = _GlobListing('\n'.join(added), gp)
+        if len(newfiles) > 0:
+            if len(files) > 0 and newmatch.dtype.kind != match.dtype.kind:
+                #match type changed, redo the whole pattern
+                del self.series[gp]
+                self.Glob(gp)
+                return
+            isort = np.argsort(newmatch, kind='stable')
+            newfiles, newmatch = newfiles[isort], newmatch[isort]
+            ii = np.searchsorted(match, newmatch, side='right')
+            files = np.insert(files, ii, newfiles)
+            match = np.insert(match.astype(newmatch.dtype), ii, newmatch)
+        self.series[gp] = (files, match)
+
+    def Glob(self, gp):
+        """ Return sorted (files, match) arrays for glob pattern `gp` (must be in this directory), indexing the pattern if it is new
+        """
+        if gp not in self.series:
+            files, match = _GlobListing('\n'.join(self.names), gp)
+            isort = np.argsort(match, kind='stable')
+            self.series[gp] = (files[isort], match[isort])
+            self.modified = True
+        return self.series[gp]
+
+    def Save(self):
+        """ Write index to disk (if it changed), so the next process can pick up where this one left off
+        """
+        if not self.modified: return
+        indexfile = self.IndexFile()
+        try:
+            MakeOutputDir(indexfile)
+            #write to temporary file first, so a concurrent reader never sees a partial index
+            tmpfile = '{}.{}.tmp'.format(indexfile, os.getpid())
+            #filenames are stored newline-joined, which pickles much faster than millions of individual strings
+            series = {gp : ('\n'.join(files), match) for gp, (files, match) in self.series.items()}
+            with open(tmpfile, 'wb') as f:
+                pickle.dump({'path':self.path, 'mtime':self.mtime, 'names':'\n'.join(self.names), 'series':series},
+                                f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpfile, indexfile)
+            self.modified = False
+        except OSError:
+            #cache is a convenience, dont fail if it cant be written
+            pass
+
+_GLOBINDICES = {} #in-memory `GlobIndex` for each directory, by absolute path
+
+def GetGlobIndex(dirname):
+    """ Get persistent `GlobIndex` for directory `dirname` (cwd if empty): from memory, then disk, otherwise start a new one
+    """
+    path = os.path.abspath(dirname if dirname else os.curdir)
+    if path not in _GLOBINDICES:
+        index = GlobIndex(path)
+        try:
+            with open(index.IndexFile(), 'rb') as f:
+                saved = pickle.load(f)
+            if saved['path'] == path:
+                index.mtime = saved['mtime']
+                index.names = set(saved['names'].split('\n')) if saved['names'] else set()
+                index.series = {gp : (np.array(files.split('\n') if files else [], dtype=object), match)
+                                    for gp, (files, match) in saved['series'].items()}
+        except Exception:
+            #missing or unreadable index, start over
+            pass
+        _GLOBINDICES[path] = index
+    return _GLOBINDICES[path]
+
+def _OrderedGlobIndexed(gp, indices=None):
+    """ `OrderedGlob` engine for a single glob pattern `gp` using the persistent `GlobIndex` of its directory
+    indices: dict of {directory: `GlobIndex`} already updated during this call, so a directory is only checked once
+    """
+    if indices is None: indices = {}
+    dirname = os.path.dirname(gp)
+    if dirname not in indices:
+        indices[dirname] = GetGlobIndex(dirname)
+        indices[dirname].Update()
+    files, match = indices[dirname].Glob(gp)
+    #return empty DF if no files globbed
+    if len(files) < 1:
+        return pd.DataFrame(columns=['file','match','tail'])
+    #'TAILS' IS FOR COMPATIBILITY
+    return pd.DataFrame({'file':files, 'match':match, 'tail':match})
+
+class FileSeries():
+    """ Numbered file series (e.g. `q.y0.NNNNNN.triq`), stored as file names sorted by their numeric glob match.
+    Queries are binary searches (`np.searchsorted`) on the sorted match array, so they are O(log n) instead of
+    a full boolean mask. `between`, `before`, `last`, and `nearest` return views of this series (no copies).
+
+    Usage:
+        series = FileSeries('q.y0.*.triq')
+        series.between(1000, 5000).every(500).files
+        series.last(3).DataFrame()
+    """
+
+    def __init__(self, globpattern=None, files=None, match=None, engine=None, sort=True):
+        """ Make file series from a glob pattern (see `OrderedGlob`) or from given files and their matches
+        Args:
+            globpattern: glob pattern(s) to get series with `OrderedGlob`
+            files: list of file names (instead of `globpattern`)
+            match: number of each file in `files`
+            engine: `OrderedGlob` engine ['scandir']
+            sort: sort `files` by `match` (`False` if they are known to already be sorted) [True]
+        """
+        if globpattern is not None:
+            df = OrderedGlob(globpattern, engine=engine)
+            files, match, sort = df['file'].values, df['match'].values, False
+        if files is None or match is None:
+            raise ValueError("FileSeries requires `globpattern` or `files` and `match`")
+        self.files = np.asarray(files, dtype=object)
+        self.match = np.asarray(match)
+        if len(self.files) != len(self.match):
+            raise ValueError("FileSeries `files` and `match` must be the same length")
+        if sort and len(self.match) > 1 and not np.all(self.match[:-1] <= self.match[1:]):
+            isort = np.argsort(self.match, kind='stable')
+            self.files, self.match = self.files[isort], self.match[isort]
+
+    def __len__(self):
+        return len(self.files)
+
+    def __iter__(self):
+        return iter(self.files)
+
+    def __repr__(self):
+        if len(self) == 0: return "FileSeries(empty)"
+        return "FileSeries({} files, {}-{})".format(len(self), self.match[0], self.match[-1])
+
+    def _Slice(self, i0, i1):
+        """ Sub-series of rows `i0:i1` (view)
+        """
+        return FileSeries(files=self.files[i0:i1], match=self.match[i0:i1], sort=False)
+
+    def _Take(self, ii):
+        """ Sub-series of row indices `ii` (copy)
+        """
+        return FileSeries(files=self.files[ii], match=self.match[ii], sort=False)
+
+    def DataFrame(self):
+        """ Return series in `OrderedGlob` format: pd.DataFrame({'file','match','tail'})
+        """
+        return pd.DataFrame({'file':self.files, 'match':self.match, 'tail':self.match})
+
+    def between(self, imin=None, imax=None):
+        """ Files with `imin` <= match <= `imax` (view)
+        Args:
+            imin: minimum match [None (start of series)]
+            imax: maximum match [None (end of series)]
+        """
+        i0 = 0 if imin is None else np.searchsorted(self.match, imin, side='left')
+        i1 = len(self) if imax is None else np.searchsorted(self.match, imax, side='right')
+        return self._Slice(i0, i1)
+
+    def before(self, i):
+        """ Files with match < `i` (view)
+        """
+        return self._Slice(0, np.searchsorted(self.match, i, side='left'))
+
+    def every(self, incr, start=None, stop=None):
+        """ Files whose match is in the interval `range(start, stop+1, incr)` (like `fileCleanUp.range_inclusive`)
+        Args:
+            incr: match interval
+            start: first match of interval [first match in series]
+            stop: last match of interval [last match in series]
+        """
+        if len(self) == 0: return self
+        if start is None: start = self.match[0]
+        if stop is None: stop = self.match[-1]
+        #only search for interval values inside the series
+        first = max(start, start + -(-(self.match[0] - start) // incr) * incr)
+        targets = np.arange(first, stop + incr/2, incr, dtype=self.match.dtype)
+        #bracket all files matching each target value
+        i0 = np.searchsorted(self.match, targets, side='left')
+        i1 = np.searchsorted(self.match, targets, side='right')
+        counts = i1 - i0
+        ii = np.repeat(i0 - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+        return self._Take(ii)
+
+    def last(self, n=1):
+        """ Files with the latest `n` unique matches (view)
+        (multiple files with the same match, e.g. multiple headers, count as one)
+        """
+        if n <= 0 or len(self) == 0: return self._Slice(len(self), len(self))
+        #step back through unique values with binary searches
+        i0 = np.searchsorted(self.match, self.match[-1], side='left')
+        for _ in range(n - 1):
+            if i0 == 0: break
+            i0 = np.searchsorted(self.match, self.match[i0 - 1], side='left')
+        return self._Slice(i0, len(self))
+
+    def nearest(self, i):
+        """ Files with the match closest to `i` (view)
+        """
+        if len(self) == 0: return self
+        j = np.searchsorted(self.match, i, side='left')
+        #pick closest neighbor
+        if j == len(self) or (j > 0 and i - self.match[j - 1] <= self.match[j] - i):
+            j -= 1
+        return self.between(self.match[j], self.match[j])
+
+def ReadSeries(globpattern, reader=None, nproc=1, backend=None, key='match', asdict=False, engine=None):
+    """ Read every file in a numbered file series into one dataframe, with each file's rows tagged by its match.
+    Files are read concurrently (see `parallelizer`), then copied once into preallocated columns in `OrderedGlob` order.
+    Columns missing from some files are NaN for those rows.
+    Args:
+        globpattern: glob pattern of file series (see `OrderedGlob`), or `FileSeries`
+        reader: function that reads a file path into a dataframe (use functools.partial for options) [`pd.read_csv`]
+        nproc: number of files to read at a time [1]
+        backend: 'thread' or 'process' (reader must be picklable) (see `parallelizer`) ['thread']
+        key: name of match column ['match']
+        asdict: return dict of column arrays instead of dataframe [False]
+        engine: `OrderedGlob` engine [None]
+    Returns:
+        dataframe (or dict of arrays) of every file's data, with match column first
+    """
+    if reader is None: reader = pd.read_csv
+    if backend is None: backend = 'thread'
+    files = globpattern if isinstance(globpattern, FileSeries) else FileSeries(globpattern, engine=engine)
+    blocks = parallelizer(list(files.files), reader, nproc=nproc, backend=backend) if len(files) > 0 else []
+    nrows = np.array([len(df) for df in blocks], dtype=np.int64)
+    blocks = [{c : np.asarray(df[c].values) for c in df.columns} for df in blocks]
+
+    #PREALLOCATE: all columns in order of first appearance, with a type for all of their data (float if some are missing)
+    cols = list(dict.fromkeys(c for b in blocks for c in b if c != key))
+    out = {key : np.repeat(files.match, nrows)}
+    for c in cols:
+        dtypes = [b[c].dtype for b in blocks if c in b]
+        missing = len(dtypes) < len(blocks)
+        out[c] = np.empty(nrows.sum(), dtype=np.result_type(*dtypes, *([np.float64] if missing else [])))
+        if missing: out[c][:] = np.nan
+    #COPY EACH FILE'S ROWS INTO PLACE
+    starts = np.cumsum(nrows) - nrows
+    for b, i0, n in zip(blocks, starts, nrows):
+        for c in cols:
+            if c in b: out[c][i0:i0 + n] = b[c]
+
+    return out if asdict else pd.DataFrame(out, copy=False)
+
+def parallelizer(inp=None, func=None, nproc=1, pool=None, stream=False, ordered=True, chunksize=None, backend=None, shared=None):
     """ Run function `func` with input any given item in list `inp` in `nproc` parallel processes
     NOTE: use functools.partial to fix other inputs of function
+    Args:
+        inp: list of inputs to `func`
+        func: function to run on each input
+        nproc: number of parallel processes (at most one per input), in a new pool that is closed when done [1]
+        backend: 'process' for CPU-bound work, 'thread' for I/O-bound work (reading files, shell commands, saving plots),
+                    'auto' times the first tasks to pick one (see `AutoBackend`) ['process']
+        shared: dict of large DataFrames that every task needs, passed to `func` as keyword arguments
+                    (`func(I, key=df)`). Numeric columns are put in shared memory once instead of pickled for every task,
+                    and each worker gets a read-only copy (see `SharedDataFrame`) [None]
+        pool: persistent `WorkerPool` to run in instead of a new pool for this call, to avoid restarting workers
+                    for many calls (e.g. `with WorkerPool(4) as pool:`, or the shared module pool `GetPool()`).
+                    Workers are forked when the pool starts, so they dont see functions defined or globals changed after [None]
+        stream: return an iterator that yields results as they finish instead of a list of all results [False]
+        ordered: streamed results are in the same order as `inp` (otherwise in order of completion) [True]
+        chunksize: number of inputs sent to a worker at a time [automatic, see `ChunkSize`]
     """
     req_args = ['inp','func']
     empty_req_args = [k for k,v in pd.Series(locals())[req_args].items() if v is None]
     if len(empty_req_args) > 0: raise ValueError("Empty required input: {}".format(', '.join(empty_req_args)))
+    if backend is None: backend = 'process'
+    if backend not in ['process', 'thread', 'auto']:
+        raise ValueError("parallelizer backend must be 'process', 'thread', or 'auto', not '{}'".format(backend))
+    if shared is not None:
+        #put shared data in shared memory (unless it already is), and free it when done
+        owned = [k for k, v in shared.items() if not isinstance(v, SharedDataFrame)]
+        shared = {k: SharedDataFrame(v) if k in owned else v for k, v in shared.items()}
+        owned = [shared[k] for k in owned]
+        out = None
+        try:
+            out = parallelizer(inp, _SharedTask(func, shared), nproc=nproc, pool=pool, stream=stream, ordered=ordered,
+                                chunksize=chunksize, backend=backend)
+        finally:
+            if not stream or out is None:
+                for s in owned: s.Close()
+        return _CloseAfter(out, owned) if stream else out
     if nproc > len(inp): nproc = len(inp)
-    if nproc > 1:
-        import multiprocessing as mp #only import if needed (in case not installed)
-        p = mp.Pool(nproc)
-        out = p.map(func, inp)
+    if pool is None and nproc > 1:
+        sampled = []
+        if backend == 'auto':
+            #run first tasks here to determine backend, then run the rest in the pool
+            inp = list(inp)
+            backend, sampled = AutoBackend(func, inp)
+            inp = inp[len(sampled):]
+        #fresh pool for this call, so workers see the caller's current functions and globals
+        pool = WorkerPool(nproc, backend)
+        try:
+            out = pool.Map(func, inp, stream=stream, ordered=ordered, chunksize=chunksize)
+        except BaseException:
+            pool.Close()
+            raise
+        if stream:
+            return itertools.chain(sampled, _CloseAfter(out, [pool]))
+        pool.Close()
+        return sampled + out
+    if pool is not None:
+        return pool.Map(func, inp, stream=stream, ordered=ordered, chunksize=chunksize)
+    elif stream:
+        return (func(I) for I in inp)
     else:
         out = []
         for I in inp:
             out.append(func(I))
     return out
 
-def dfparallelizer(df, func, nproc=1):
-    """ Assumes the input to `func` is each row of the dataframe `df`.
+def ChunkSize(ntask, nproc, tasktime=None, target=0.1):
+    """ Number of tasks to send to a pool worker at a time.
+    Chunks should take at least `target` seconds to amortize the cost of sending them to the workers,
+    but there should be at least 4 chunks per worker so the work is balanced.
+    Args:
+        ntask: number of tasks
+        nproc: number of workers
+        tasktime: measured time of one task [None, just balance the work]
+        target: minimum chunk run time [0.1s]
+    """
+    maxchunk = max(1, -(-ntask // (4 * nproc)))
+    if tasktime is None or tasktime <= 0: return maxchunk
+    return int(min(maxchunk, max(1, np.ceil(target / tasktime))))
+
+class _TimedTask():
+    """ Picklable wrapper that returns result and run time of `func` in a pool worker
+    """
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, I):
+        t0 = time.perf_counter()
+        out = self.func(I)
+        return out, time.perf_counter() - t0
+
+class WorkerPool():
+    """ Reusable pool of worker processes (or threads) for `parallelizer`
+    (instead of starting a new `multiprocessing.Pool` for every call).
+    Closes its processes on exit when used as a context manager, otherwise call `Close`.
+
+    Usage:
+        with WorkerPool(8) as pool:
+            for case in cases:
+                out = parallelizer(files[case], func, pool=pool)
+    """
+
+    def __init__(self, nproc=None, backend=None):
+        """ Start worker processes
+        Args:
+            nproc: number of worker processes [number of cpus]
+            backend: 'process' or 'thread' (no pickling, but shares the GIL, so only for I/O-bound work) ['process']
+        """
+        import multiprocessing as mp #only import if needed (in case not installed)
+        self.nproc = mp.cpu_count() if nproc is None else nproc
+        self.backend = 'process' if backend is None else backend
+        if self.backend == 'thread':
+            from multiprocessing.pool import ThreadPool
+            self.pool = ThreadPool(self.nproc)
+        elif self.backend == 'process':
+            self.pool = mp.Pool(self.nproc)
+        else:
+            raise ValueError("WorkerPool backend must be 'process' or 'thread', not '{}'".format(self.backend))
+        self.tasktimes = weakref.WeakKeyDictionary() #measured run time per task for each function, for sizing chunks next time
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Close()
+
+    def Close(self):
+        """ Stop worker processes
+        """
+        if self.pool is None: return
+        self.pool.close()
+        self.pool.join()
+        self.pool = None
+
+    def Map(self, func, inp, stream=False, ordered=True, chunksize=None):
+        """ Run function `func` on each item in list `inp` (see `parallelizer`)
+        """
+        if self.pool is None: raise ValueError("WorkerPool has been closed")
+        inp = list(inp)
+        key = _FuncKey(func)
+        if chunksize is None: chunksize = ChunkSize(len(inp), self.nproc, _CacheGet(self.tasktimes, key))
+        if not stream:
+            out, dts = zip(*self.pool.map(_TimedTask(func), inp, chunksize)) if len(inp) > 0 else ([], [])
+            if len(dts) > 0: _CacheSet(self.tasktimes, key, float(np.mean(dts)))
+            return list(out)
+        #results are submitted now, but collected as they are consumed
+        mapper = self.pool.imap if ordered else self.pool.imap_unordered
+        return self._Stream(mapper(_TimedTask(func), inp, chunksize), key)
+
+    def _Stream(self, results, key):
+        """ Yield results of `imap` as they finish, keeping track of task run time
+        """
+        dts = []
+        for out, dt in results:
+            dts.append(dt)
+            yield out
+        if len(dts) > 0: _CacheSet(self.tasktimes, key, float(np.mean(dts)))
+
+def _FuncKey(func):
+    """ The user's function object behind `func` (unwrapping this module's task wrappers), to remember its measured
+    run time or backend. Keyed on the object itself, so different lambdas or partials never share a key
     """
-    indices, rows = zip(*df.iterrows())
-    parallelizer(rows, func, nproc=nproc)
+    while isinstance(func, (_TimedTask, _SharedTask, _RowApply)): func = func.func
+    return func
+
+def _CacheGet(cache, func):
+    """ Value remembered for function object `func` in weak-keyed `cache` (None if not remembered or not weak-referenceable)
+    """
+    try:
+        return cache.get(func)
+    except TypeError:
+        return None
+
+def _CacheSet(cache, func, value):
+    """ Remember value for function object `func` in weak-keyed `cache` (forgotten when `func` is deleted)
+    """
+    try:
+        cache[func] = value
+    except TypeError:
+        #e.g. builtins cant be weakly referenced, dont remember them
+        pass
+
+_POOLS = {} #shared `WorkerPool` of each backend used by `parallelizer`
+
+def GetPool(nproc=None, backend=None):
+    """ Get the shared module `WorkerPool` for `backend` ['process'],
+    (re)starting it if it isnt running or has a different number of processes.
+    Opt-in: pass it to `parallelizer(..., pool=GetPool())` to reuse the same workers across calls
+    (workers are forked once, so they dont see functions defined or globals changed after the pool starts)
+    """
+    if backend is None: backend = 'process'
+    pool = _POOLS.get(backend)
+    if pool is None or pool.pool is None or (nproc is not None and pool.nproc != nproc):
+        ClosePool(backend)
+        _POOLS[backend] = WorkerPool(nproc, backend)
+    return _POOLS[backend]
+
+def ClosePool(backend=None):
+    """ Stop the shared module `WorkerPool` for `backend` [all backends] (automatically called at exit)
+    """
+    for b in list(_POOLS) if backend is None else [backend]:
+        if b in _POOLS: _POOLS.pop(b).Close()
+
+_AUTOBACKENDS = weakref.WeakKeyDictionary() #backend chosen by `AutoBackend` for each function object
+
+def _NamedFunction(func):
+    """ `func` is a named, module-level function (or `functools.partial` of one), not a lambda or closure
+    whose behavior can differ between objects made from the same code
+    """
+    while isinstance(func, functools.partial): func = func.func
+    name = getattr(func, '__qualname__', None)
+    return name is not None and '<lambda>' not in name and '<locals>' not in name and not getattr(func, '__closure__', None)
+
+def AutoBackend(func, inp, nsample=2, cpufrac=0.5):
+    """ Choose `parallelizer` backend for function `func` by timing the first `nsample` tasks of `inp` here.
+    Tasks that use less than `cpufrac` of their wall time on cpu are mostly waiting (I/O-bound), so use threads,
+    otherwise use processes. Decision is printed (to pin it in production scripts) and remembered for the rest of this process
+    (for named functions only, lambdas and closures are timed every call).
+    Returns:
+        backend: 'thread' or 'process'
+        out: results of the sampled tasks (empty if decision was remembered)
+    """
+    key = _FuncKey(func)
+    remember = _NamedFunction(key)
+    if remember and _CacheGet(_AUTOBACKENDS, key) is not None: return _AUTOBACKENDS[key], []
+    out = []
+    cpu0, wall0 = time.thread_time(), time.perf_counter()
+    for I in inp[:nsample]:
+        out.append(func(I))
+    cpu, wall = time.thread_time() - cpu0, time.perf_counter() - wall0
+    ratio = min(cpu / wall, 1.0) if wall > 0 else 1.0
+    backend = 'process' if ratio >= cpufrac else 'thread'
+    name = getattr(key.func if isinstance(key, functools.partial) else key, '__qualname__', repr(key))
+    print("parallelizer: `{}` used {:.0%} cpu per task, using backend='{}' (set `backend='{}'` to skip this test)".format(name, ratio, backend, backend))
+    if remember: _CacheSet(_AUTOBACKENDS, key, backend)
+    return backend, out
+
+atexit.register(ClosePool)
+
+def dfparallelizer(df, func, nproc=1, rowwise=False, nblock=None, **kwargs):
+    """ Run function `func` on contiguous blocks of rows of dataframe `df` in `nproc` parallel processes,
+    and return the results concatenated back together in the original row order.
+    (Sending a few large blocks to the workers is much cheaper than pickling every row separately)
+    Args:
+        df: dataframe to process
+        func: function to run on each block (input is a DataFrame, output should be DataFrame, Series, or array to concatenate)
+        nproc: number of parallel processes [1]
+        rowwise: compatibility mode, the input to `func` is each row of `df` (as a Series), returns list of each row's result [False]
+        nblock: number of blocks to split `df` into [`nproc`]
+        kwargs: other `parallelizer` inputs (e.g. `pool`, `backend`)
+    Returns:
+        concatenated results (list of each block's result if they cant be concatenated)
+    """
+    if nblock is None: nblock = nproc
+    nblock = max(1, min(nblock, len(df)))
+    kwargs.setdefault('chunksize', 1) #blocks are already chunks
+    #split into contiguous blocks (`iloc` slices are views, so no copies until they are sent to the workers)
+    bounds = np.linspace(0, len(df), nblock + 1).astype(int)
+    blocks = [df.iloc[i0:i1] for i0, i1 in zip(bounds[:-1], bounds[1:])]
+
+    if rowwise:
+        #rows are still processed in blocks, so only blocks need to be pickled
+        out = parallelizer(blocks, _RowApply(func), nproc=nproc, **kwargs)
+        return [o for block in out for o in block]
+
+    out = parallelizer(blocks, func, nproc=nproc, **kwargs)
+    if all(isinstance(o, (pd.DataFrame, pd.Series)) for o in out):
+        return pd.concat(out)
+    elif all(isinstance(o, np.ndarray) for o in out):
+        return np.concatenate(out)
+    return out
+
+class _RowApply():
+    """ Picklable wrapper that runs `func` on each row of a block for `dfparallelizer(rowwise=True)`
+    """
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, block):
+        return [self.func(row) for _, row in block.iterrows()]
+
+class SharedDataFrame():
+    """ DataFrame with its numeric columns stored once in `multiprocessing.shared_memory`, so that parallel workers
+    can all read the same data without each task pickling its own copy (peak memory ~1x data size instead of Nproc x).
+    Pickling this object only sends the shared memory names, workers rebuild a read-only DataFrame over the shared buffers.
+    (Non-numeric columns and the index are pickled normally)
+    Shared memory is released by `Close` (or when used as a context manager, or when this object is garbage collected).
+
+    Usage:
+        parallelizer(windows, func, nproc=8, shared={'df':df}) #calls func(window, df=<read-only df>)
+    """
+
+    def __init__(self, df):
+        """ Copy numeric columns of `df` into shared memory (one segment per dtype)
+        """
+        from multiprocessing import shared_memory #only import if needed
+        self.columns = list(df.columns)
+        self.index = df.index
+        self.nrow = len(df)
+        numeric = df.select_dtypes(include=[np.number, np.bool_])
+        self.other = df.drop(columns=numeric.columns)
+        self.segments = [] #(shared memory name, dtype, columns in segment)
+        shms = []
+        try:
+            for dtype, cols in numeric.columns.groupby(numeric.dtypes).items():
+                dtype, cols = np.dtype(dtype), list(cols)
+                shm = shared_memory.SharedMemory(create=True, size=max(1, len(cols) * self.nrow * dtype.itemsize))
+                shms.append(shm)
+                #each column is one contiguous row of the segment
+                arr = np.ndarray((len(cols), self.nrow), dtype=dtype, buffer=shm.buf)
+                for i, c in enumerate(cols): arr[i] = numeric[c].values
+                del arr
+                self.segments.append((shm.name, dtype.str, cols))
+        except Exception:
+            _UnlinkShared(shms)
+            raise
+        #owner of the shared memory unlinks it when done, even if `Close` is never called
+        self._finalizer = weakref.finalize(self, _UnlinkShared, shms)
+        self._attached = []
+
+    def __getstate__(self):
+        return {k: self.__dict__[k] for k in ['columns', 'index', 'nrow', 'other', 'segments']}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._finalizer = None #copies dont own the shared memory
+        self._attached = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Close()
+
+    def DataFrame(self):
+        """ Return read-only DataFrame over the shared memory (call `Detach` when done with it in a worker)
+        """
+        from multiprocessing import shared_memory
+        data = {}
+        for name, dtype, cols in self.segments:
+            shm = shared_memory.SharedMemory(name=name)
+            self._attached.append(shm)
+            arr = np.ndarray((len(cols), self.nrow), dtype=np.dtype(dtype), buffer=shm.buf)
+            arr.flags.writeable = False
+            for i, c in enumerate(cols): data[c] = arr[i]
+        for c in self.other.columns: data[c] = self.other[c].values
+        return pd.DataFrame({c: data[c] for c in self.columns}, index=self.index, copy=False)
+
+    def Detach(self):
+        """ Release this process's mapping of the shared memory
+        (mappings still referenced by a DataFrame are kept and released on a later call)
+        """
+        _SHAREDPENDING.extend(self._attached)
+        self._attached = []
+        for shm in list(_SHAREDPENDING):
+            try:
+                shm.close()
+                _SHAREDPENDING.remove(shm)
+            except BufferError:
+                #data is still in use
+                pass
+
+    def Close(self):
+        """ Free the shared memory (owner only, copies just detach)
+        """
+        self.Detach()
+        if self._finalizer is not None: self._finalizer()
+
+_SHAREDPENDING = [] #shared memory mappings that couldnt be closed yet because they were still in use
+
+def _UnlinkShared(shms):
+    """ Close and free list of shared memory segments
+    """
+    for shm in shms:
+        try:
+            shm.close()
+        except BufferError:
+            pass
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+class _SharedTask():
+    """ Picklable wrapper that runs `func(I, **shared)` with read-only DataFrames rebuilt from `SharedDataFrame`s in a worker
+    """
+    def __init__(self, func, shared):
+        self.func = func
+        self.shared = shared
+
+    def __call__(self, I):
+        try:
+            out = self.func(I, **{k: s.DataFrame() for k, s in self.shared.items()})
+        finally:
+            for s in self.shared.values(): s.Detach()
+        return out
+
+def _CloseAfter(results, shared):
+    """ Yield streamed results, then close the resources in list `shared` (shared memory, pools)
+    """
+    try:
+        for out in results:
+            yield out
+    finally:
+        for s in shared: s.Close()
 
 # ======================================================================
 # PANDAS UTILITIES
 # ======================================================================
 
-def dfInterp(df, key=None, vals=None, method=None):
+def dfInterp(df, key=None, vals=None, method=None, engine=None):
     """Interpolate a Pandas DataFrame so that the selected column matches the provided list.
     Don't extrapolate outside of data range and don't interpolate non-numeric columns.
     NOTE: Recommended use time as 'key' for timeseries data for correct interp
@@ -360,6 +1200,9 @@ def dfInterp(df, key=None, vals=None, method=None):
         vals   (:obj:`list` or :obj:`~numpy.array`): values to interpolate to
         method (:obj:`str`): interpolation method (['linear'], 'nearest', 'cubic')
                     (see `~scipy.interpolate.interp1d` for more options)
+        engine (:obj:`str`): 'numpy' interpolates all columns at once with `np.searchsorted` for linear interpolation
+                    of a sorted key (falls back to 'pandas' otherwise), 'pandas' is the original `reindex`+`interpolate` ['numpy']
+                    (to interpolate many frames on the same grid, reuse the weights with `Interpolator`)
     Returns:
         (:obj:`~pandas.DataFrame`): dataframe interpolated to `vals`
     """
@@ -368,15 +1211,19 @@ def dfInterp(df, key=None, vals=None, method=None):
 
     #default is linear interpolation by the index (pandas interpolation with 'linear' ignores the index)
     if method is None or method == 'linear': method = 'index'
+    if engine is None: engine = 'numpy'
 
-    #use given column for interpolation (if specified, otherwise use index)
-    if key is not None: df = df.set_index(key)
+    #don't interpolate non-numeric columns
+    numeric = df.select_dtypes(include=np.number).columns
+    df = df[[c for c in df.columns if c == key or c in numeric]]
+    #independent variable (interpolation column if specified, otherwise index)
+    x = df.index if key is None else df[key]
 
     #this var only has default value to preserve original order of args
     if vals is None:
         raise ValueError("`vals` is required input")
-    elif not isinstance(vals, (list, np.array)):
-        raise TypeError("`vals` must be list or int")
+    elif not isinstance(vals, (list, np.ndarray, pd.Series)):
+        raise TypeError("`vals` must be list or array")
     else:
         vals = np.array(vals)
 
@@ -384,26 +1231,240 @@ def dfInterp(df, key=None, vals=None, method=None):
     #INTERPOLATE
 
     #dont extrapolate outside of data range
-    vals = vals[(vals >= min(df.index.values)) & (vals <= max(df.index.values))]
-
-    #interpolate
-    # 1. `reindex`+`union`: extend index (interpolation column) with values to interpolated to (fill with NaN in other cols where there is no overlap) ((combined index is automatically sorted by `union`))
-    # 2. `interpolate`: fill NaNs in all other columns by interpolation (`limit_direction`: fill consecutive NaNs starting from both directions of the gap)
-    # 3. `loc`: return values only at the given interpolation points
-    # 4. `dropna`: remove NaN columns that correspond to non-interpolatable (non-numeric) parameters
-    df2 =  df.reindex(df.index.union(vals)).interpolate(method=method, limit_direction='both', ).loc[vals].dropna(how='all', axis='columns')
-    #restore original index name after `reindex` blitzed it
-    df2.index.name = df.index.name
+    vals = vals[(vals >= x.min()) & (vals <= x.max())]
+
+    if engine == 'numpy' and method == 'index' and np.issubdtype(x.dtype, np.number) and np.all(np.diff(x.values) > 0):
+        #fast path for linear interpolation of sorted data
+        cols = [c for c in df.columns if c != key]
+        xv = np.asarray(x.values, dtype=np.float64)
+        df2 = pd.DataFrame(_InterpColumnsWeighted(_InterpWeights(xv, vals), xv, [df[c].values for c in cols]),
+                            index=pd.Index(vals, name=key if key is not None else df.index.name), columns=cols).dropna(how='all', axis='columns')
+    else:
+        #use given column for interpolation (if specified, otherwise use index)
+        if key is not None: df = df.set_index(key)
+        #interpolate
+        # 1. `reindex`+`union`: extend index (interpolation column) with values to interpolated to (fill with NaN in other cols where there is no overlap) ((combined index is automatically sorted by `union`))
+        # 2. `interpolate`: fill NaNs in all other columns by interpolation (`limit_direction`: fill consecutive NaNs starting from both directions of the gap)
+        # 3. `loc`: return values only at the given interpolation points
+        # 4. `dropna`: remove NaN columns that correspond to non-interpolatable (non-numeric) parameters
+        df2 =  df.reindex(df.index.union(vals)).interpolate(method=method, limit_direction='both', ).loc[vals].dropna(how='all', axis='columns')
+        #restore original index name after `reindex` blitzed it
+        df2.index.name = df.index.name
 
     #restore interpolation column if it was not originally the index
     if key is not None: df2 = df2.reset_index()
 
     return df2
 
+def _InterpColumns(x, ys, xi):
+    """ Linearly interpolate every column `y(x)` in list `ys` to `xi` (same result as `np.interp` on each column)
+    One `searchsorted` finds the bracketing points for all columns, then each column is just a gather and multiply-add.
+    Columns with NaNs are interpolated between their valid points only (like `pd.DataFrame.interpolate`)
+    Args:
+        x: sorted, unique 1D array of independent variable
+        ys: list of 1D arrays of dependent variables (same length as `x`)
+        xi: values to interpolate to, within range of `x`
+    Returns:
+        2D array (len(xi), len(ys))
+    """
+    x = np.asarray(x, dtype=np.float64)
+    return _InterpColumnsWeighted(_InterpWeights(x, xi), x, ys)
 
+def _InterpWeights(x, xi):
+    """ Bracketing indices and weights for linear interpolation from sorted, unique `x` to `xi` (within range of `x`)
+    Returns:
+        (xi, bracket start index, distance from bracket start, bracket width, `xi` is exactly last point)
+    """
+    xi = np.asarray(xi, dtype=np.float64)
+    if len(x) < 2: return xi, None, None, None, None
+    j = np.clip(np.searchsorted(x, xi, side='right') - 1, 0, len(x) - 2)
+    return xi, j, xi - x[j], x[j + 1] - x[j], xi == x[-1]
 
-def dfSubset(df, tmin=None, tmax=None, tevery=None, tkey=None, tkeymin=None, tkeymax=None, reindex=True, ):
-    """Get interval subset of provided dataframe
+def _InterpApply(weights, x, y):
+    """ Interpolate `y(x)` with weights from `_InterpWeights` (gather and multiply-add, same result as `np.interp`)
+    """
+    xi, j, dx, h, last = weights
+    y = np.asarray(y, dtype=np.float64)
+    if np.isnan(y).any():
+        #interpolate between valid points only
+        valid = ~np.isnan(y)
+        return np.interp(xi, x[valid], y[valid]) if valid.any() else np.full(len(xi), np.nan)
+    elif j is None:
+        #single point
+        return np.full(len(xi), y[0])
+    yj = y[j]
+    out = (y[j + 1] - yj) / h * dx + yj
+    out[last] = y[-1]
+    return out
+
+def _GridKey(x, nsample=64):
+    """ Cheap key of 1D grid `x` (length and a strided sample of values, including endpoints) to look up
+    cached interpolators. Grids with the same key still need to be compared in full
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if len(x) == 0: return (0, b'')
+    sample = np.append(x[::max(1, len(x) // nsample)], x[-1])
+    return (len(x), sample.tobytes())
+
+class Interpolator():
+    """ Linear interpolation from a source grid `x` to target values `vals`, with the bracketing indices and weights
+    computed once. Interpolating any data on the same source grid (e.g. every snapshot of a file series)
+    is then just a gather and multiply-add per column, instead of redoing the `searchsorted`.
+    Target values outside of the source grid are dropped (like `dfInterp`).
+    The source grid is referenced, not copied (so it stays in memory as long as the interpolator does).
+    (Use `GetInterpolator` to reuse interpolators from a cache instead of making them directly)
+
+    Usage:
+        interp = Interpolator(df0['time'], vals)
+        for df in dfs: dfi = interp.Apply(df, key='time')
+    """
+
+    def __init__(self, x, vals):
+        """ Compute interpolation weights
+        Args:
+            x: sorted, unique source grid
+            vals: values to interpolate to
+        """
+        self.x = np.asarray(x, dtype=np.float64)
+        if len(self.x) < 1 or not np.all(np.diff(self.x) > 0):
+            raise ValueError("Interpolator source grid must be sorted and unique (no NaN)")
+        vals = np.asarray(vals, dtype=np.float64)
+        self.request = vals #requested target values (including any outside of the source grid)
+        #dont extrapolate outside of data range
+        self.vals = vals[(vals >= self.x[0]) & (vals <= self.x[-1])]
+        self.weights = _InterpWeights(self.x, self.vals)
+        self.nbytes = self.x.nbytes + self.request.nbytes + sum(w.nbytes for w in self.weights if isinstance(w, np.ndarray))
+
+    def __len__(self):
+        return len(self.vals)
+
+    def Check(self, x):
+        """ True if grid `x` is the same as this interpolator's source grid (so its weights are still valid)
+        """
+        x = np.asarray(x)
+        if x is self.x: return True
+        return len(x) == len(self.x) and (len(x) == 0 or (x[0] == self.x[0] and x[-1] == self.x[-1])) \
+                    and np.array_equal(x, self.x)
+
+    def Apply(self, data, key=None, check=True):
+        """ Interpolate data on the source grid to the target values
+        Args:
+            data: DataFrame, or 1D/2D array with rows on the source grid
+            key: DataFrame column of source grid [index]
+            check: make sure DataFrame's grid matches the source grid, raise ValueError otherwise [True]
+        Returns:
+            same as `dfInterp` for DataFrame (numeric columns only), otherwise array with rows on the target values
+        """
+        if not isinstance(data, pd.DataFrame):
+            data = np.asarray(data)
+            if data.shape[0] != len(self.x): raise ValueError("Interpolator data must have same number of rows as source grid")
+            if data.ndim == 1: return _InterpApply(self.weights, self.x, data)
+            return np.column_stack([_InterpApply(self.weights, self.x, data[:, i]) for i in range(data.shape[1])]) \
+                        if data.shape[1] > 0 else np.empty((len(self), 0))
+        x = data.index if key is None else data[key]
+        if check and not self.Check(x.values):
+            raise ValueError("DataFrame grid `{}` does not match Interpolator source grid".format(key))
+        cols = [c for c in data.select_dtypes(include=np.number).columns if c != key]
+        df = pd.DataFrame(_InterpColumnsWeighted(self.weights, self.x, [data[c].values for c in cols]),
+                            index=pd.Index(self.vals, name=key if key is not None else data.index.name), columns=cols)
+        df = df.dropna(how='all', axis='columns')
+        #restore interpolation column if it was not originally the index
+        if key is not None: df = df.reset_index()
+        return df
+
+def _InterpColumnsWeighted(weights, x, ys):
+    """ `_InterpColumns` with precomputed weights
+    """
+    out = np.empty((len(weights[0]), len(ys)))
+    for i, y in enumerate(ys):
+        out[:, i] = _InterpApply(weights, x, y)
+    return out
+
+INTERPCACHESIZE = 32 #number of `Interpolator`s to keep in `GetInterpolator` cache
+INTERPCACHEBYTES = 2**28 #maximum memory of source grids and weights referenced by `GetInterpolator` cache (bytes)
+_INTERPOLATORS = collections.OrderedDict() #least recently used `Interpolator` cache
+
+def GetInterpolator(x, vals):
+    """ Get `Interpolator` from source grid `x` to `vals` from least-recently-used cache, or make a new one if it isnt cached.
+    Cache is keyed on a sample of both grids (see `_GridKey`), and a hit is only used if both grids are equal in full.
+    Cached interpolators keep their source grids in memory, so the cache is limited to `INTERPCACHESIZE` interpolators
+    and `INTERPCACHEBYTES` total
+    """
+    vals = np.asarray(vals, dtype=np.float64)
+    cachekey = (_GridKey(x), _GridKey(vals))
+    interp = _INTERPOLATORS.get(cachekey)
+    if interp is not None and interp.Check(x) and np.array_equal(interp.request, vals):
+        _INTERPOLATORS.move_to_end(cachekey)
+        return interp
+    interp = Interpolator(x, vals)
+    _INTERPOLATORS[cachekey] = interp
+    _INTERPOLATORS.move_to_end(cachekey)
+    while len(_INTERPOLATORS) > INTERPCACHESIZE or \
+            (len(_INTERPOLATORS) > 1 and sum(i.nbytes for i in _INTERPOLATORS.values()) > INTERPCACHEBYTES):
+        _INTERPOLATORS.popitem(last=False)
+    return interp
+
+def dfInterpMany(dfs, key=None, vals=None, cols=None, asarray=False, nproc=1):
+    """Linearly interpolate many DataFrames (e.g. case histories) onto the same grid in one call.
+    The target grid is prepared once and every case is written straight into one preallocated output array.
+    Unlike `dfInterp`, grid points outside a case's data range are NaN (so all cases have the same shape).
+
+    Args:
+        dfs    (:obj:`list` or :obj:`dict`): DataFrames to interpolate (dict keys are case names)
+        key    (:obj:`str`): column key for independent variable to interpolate against [index]
+        vals   (:obj:`list` or :obj:`~numpy.array`): values to interpolate to
+        cols   (:obj:`list`): columns to interpolate (NaN for cases without a column) [numeric columns of first case]
+        asarray (:obj:`bool`): return numpy array instead of DataFrame [False]
+        nproc  (:obj:`int`): number of threads to interpolate cases with [1]
+    Returns:
+        (:obj:`~pandas.DataFrame`): interpolated data with (case, `key`) MultiIndex
+        or (:obj:`~numpy.array`): interpolated data (case x vals x column) if `asarray`
+    """
+    if vals is None: raise ValueError("`vals` is required input")
+    if isinstance(dfs, dict):
+        cases, dfs = list(dfs.keys()), list(dfs.values())
+    else:
+        dfs = list(dfs)
+        cases = list(range(len(dfs)))
+    if cols is None:
+        cols = [c for c in dfs[0].select_dtypes(include=np.number).columns if c != key] if len(dfs) > 0 else []
+
+    #TARGET GRID (SHARED BY ALL CASES)
+    vals = np.asarray(vals, dtype=np.float64)
+    out = np.full((len(dfs), len(vals), len(cols)), np.nan)
+
+    #INTERPOLATE EACH CASE INTO OUTPUT
+    parallelizer(list(range(len(dfs))), functools.partial(_InterpCase, dfs=dfs, key=key, vals=vals, cols=cols, out=out),
+                    nproc=nproc, backend='thread')
+
+    if asarray: return out
+    index = pd.MultiIndex.from_product([cases, vals], names=['case', key if key is not None else (dfs[0].index.name if len(dfs) > 0 else None)])
+    return pd.DataFrame(out.reshape(len(dfs) * len(vals), len(cols)), index=index, columns=cols, copy=False)
+
+def _InterpCase(i, dfs, key, vals, cols, out):
+    """ Interpolate case `i` of `dfInterpMany` into its slice of the output array
+    """
+    df = dfs[i]
+    x = np.asarray(df.index if key is None else df[key], dtype=np.float64)
+    ys = [df[c].values if c in df else None for c in cols]
+    if not np.all(np.diff(x) > 0):
+        #sort by interpolation key
+        isort = np.argsort(x, kind='stable')
+        x = x[isort]
+        ys = [y if y is None else y[isort] for y in ys]
+        if not np.all(np.diff(x) > 0): raise ValueError("Case {}: interpolation key `{}` has duplicate or NaN values".format(i, key))
+    #dont extrapolate outside of data range
+    inrange = (vals >= x[0]) & (vals <= x[-1]) if len(x) > 0 else np.zeros(len(vals), dtype=bool)
+    icols = [j for j, y in enumerate(ys) if y is not None]
+    if not inrange.any() or len(icols) == 0: return
+    out[i, np.where(inrange)[0][:, None], icols] = _InterpColumns(x, [ys[j] for j in icols], vals[inrange])
+
+
+
+def dfSubset(df, tmin=None, tmax=None, tevery=None, tkey=None, tkeymin=None, tkeymax=None, reindex=True, copy=False, issorted=None, ):
+    """Get interval subset of provided dataframe.
+    If the bound keys are sorted, bounds are found with `np.searchsorted` and the subset is a single `iloc` slice
+    (including downsampling), so it shares memory with `df` instead of copying it (unless `copy`)
 
     Args:
         df (:obj:`~pandas.DataFrame`): Contains time series data
@@ -413,7 +1474,10 @@ def dfSubset(df, tmin=None, tmax=None, tevery=None, tkey=None, tkeymin=None, tke
         tkey (:obj:`str`): key indicating which parameter given bounds pertain to ['time']
         tkeymin (:obj:`str`): use unique parameter for minimum bound [`tkey`]
         tkeymax (:obj:`str`): use unique parameter for maximum bound [`tkey`]
-        reindex (:obj:`bool`): reset index after trimming/downsampling [False]
+        reindex (:obj:`bool`): reset index after trimming/downsampling [True]
+        copy (:obj:`bool`): return a copy instead of a view of `df` [False]
+        issorted (:obj:`bool`): bound keys are sorted ascending with no NaN. None checks (a pass over the keys), so
+                    set True to skip the check for repeated subsets of large, known-sorted data [None]
 
     TODO:
         - Currently cant trim minimum to a value relative from end if the x-axis has negative data
@@ -428,30 +1492,63 @@ def dfSubset(df, tmin=None, tmax=None, tevery=None, tkey=None, tkeymin=None, tke
     if key[0] is None: key[0] = 'time'
     if key[1] is None: key[1] = 'time'
 
-    #Trim time series to specified minimum
-    if lim[0] is not None:
-        #allow bound relative to end point (need 'dropna' since NaN is a max) UNLESS the data has negative values
-        if lim[0] < 0 and min(df[key[0]]) >= 0: lim[0] = max(df[key[0]].dropna()) - abs(lim[0])
-        #trim, but dont trim to oblivion
-        if max(df[key[0]]) > lim[0]:
-            df = df[df[key[0]] >= lim[0]]
-        else:
-            print("    Trimming min `{}` to `{}` would obliviate df, skipping trim".format(tkeymin, lim[0]))
-
-    #Trim time series to specified maximum
-    if lim[1] is not None:
-        #allow bound relative to end point (need 'dropna' since NaN is a max) UNLESS the data has negative values
-        if lim[1] < 0 and min(df[key[1]]) >= 0: lim[1] = min(df[key[1]].dropna()) + abs(lim[1])
-        #trim, but dont trim to oblivion
-        if min(df[key[1]]) < lim[1]:
-            df = df[df[key[1]] <= lim[1]]
-        else:
-            print("    Trimming max `{}` to `{}` would obliviate df, skipping trim".format(tkeymin, lim[1]))
+    #only check keys that are actually used for trimming
+    used = [k for k, l in zip(key, lim) if l is not None]
+    if issorted is None: issorted = len(df) > 0 and all(df[k].is_monotonic_increasing and not df[k].hasnans for k in set(used))
+
+    if issorted and len(df) > 0:
+        #SORTED: find bounds by bisection, then trim and downsample in one slice
+        i0, i1 = 0, len(df)
+        if lim[0] is not None:
+            x = df[key[0]].values
+            #allow bound relative to end point UNLESS the data has negative values
+            if lim[0] < 0 and x[0] >= 0: lim[0] = x[-1] - abs(lim[0])
+            #trim, but dont trim to oblivion
+            if x[-1] > lim[0]:
+                i0 = int(np.searchsorted(x, lim[0], side='left'))
+            else:
+                print("    Trimming min `{}` to `{}` would obliviate df, skipping trim".format(key[0], lim[0]))
+        if lim[1] is not None:
+            x = df[key[1]].values
+            #(bounds are relative to the data that is left after the minimum trim)
+            if lim[1] < 0 and x[i0] >= 0: lim[1] = x[i0] + abs(lim[1])
+            if x[i0] < lim[1]:
+                i1 = int(np.searchsorted(x, lim[1], side='right'))
+            else:
+                print("    Trimming max `{}` to `{}` would obliviate df, skipping trim".format(key[1], lim[1]))
+        #Reduce points by interval (keep every 'tevery'-th row, reversed if negative)
+        step = 1 if tevery is None else int(tevery)
+        df = df.iloc[i0:i1:step] if step > 0 else df.iloc[i1-1:(i0-1 if i0 > 0 else None):step]
+
+    else:
+        #UNSORTED: trim with boolean masks
+
+        #Trim time series to specified minimum
+        if lim[0] is not None:
+            #allow bound relative to end point UNLESS the data has negative values
+            if lim[0] < 0 and df[key[0]].min() >= 0: lim[0] = df[key[0]].max() - abs(lim[0])
+            #trim, but dont trim to oblivion
+            if df[key[0]].max() > lim[0]:
+                df = df[df[key[0]] >= lim[0]]
+            else:
+                print("    Trimming min `{}` to `{}` would obliviate df, skipping trim".format(key[0], lim[0]))
+
+        #Trim time series to specified maximum
+        if lim[1] is not None:
+            #allow bound relative to end point UNLESS the data has negative values
+            if lim[1] < 0 and df[key[1]].min() >= 0: lim[1] = df[key[1]].min() + abs(lim[1])
+            #trim, but dont trim to oblivion
+            if df[key[1]].min() < lim[1]:
+                df = df[df[key[1]] <= lim[1]]
+            else:
+                print("    Trimming max `{}` to `{}` would obliviate df, skipping trim".format(key[1], lim[1]))
+
+        #Reduce points by interval (keep every 'tevery'-th row)
+        if tevery is not None: df = df.iloc[::int(tevery)]
 
-    #Reduce points by interval (keep every 'tevery'-th row)
-    if tevery is not None: df = df.loc[::int(tevery),:]
     #reset df index
     if reindex: df = df.reset_index(drop=True)
+    if copy: df = df.copy()
 
     return df
 
@@ -514,6 +1611,46 @@ def dfNearestRow(df, key, val):
     """
     return df.loc[[df[key].sub(val).abs().idxmin()]]
 
+def dfNearestRows(df, key, vals, tol=None, issorted=None):
+    """ Find rows in dataframe where `key` column is closest/nearest to each of `vals` (batched `dfNearestRow`).
+    One `searchsorted` pass finds the neighbors of every value, then all rows are taken at once.
+    Ties go to the first row (like `dfNearestRow`)
+    Args:
+        df: dataframe to search
+        key: column to match `vals` against
+        vals: values to find nearest rows to
+        tol: drop values with no row within this distance [None]
+        issorted: `key` is sorted ascending with no NaN. None checks, False sorts a copy of the key [None]
+    Returns:
+        dataframe with the nearest row to each value (in order of `vals`, original index)
+    """
+    x = df[key].values
+    vals = np.atleast_1d(np.asarray(vals))
+    if issorted is None: issorted = df[key].is_monotonic_increasing and not df[key].hasnans
+
+    if issorted:
+        xs, order = x, None
+    else:
+        #sort key (stable so duplicates stay in row order), NaNs sort to the end and are never nearest
+        order = np.argsort(x, kind='stable')
+        xs = x[order]
+        xs = xs[:len(xs) - np.count_nonzero(np.isnan(xs))] if np.issubdtype(xs.dtype, np.floating) else xs
+    if len(xs) == 0: return df.iloc[[]]
+
+    #neighbors on either side of each value (first row of each duplicated key value)
+    right = np.minimum(np.searchsorted(xs, vals, side='left'), len(xs) - 1)
+    left = np.searchsorted(xs, xs[np.maximum(right - 1, 0)], side='left')
+    dleft, dright = np.abs(vals - xs[left]), np.abs(xs[right] - vals)
+    if order is not None: left, right = order[left], order[right]
+    useright = (dright < dleft) | ((dright == dleft) & (right < left))
+    rows = np.where(useright, right, left)
+
+    if tol is not None: rows = rows[np.where(useright, dright, dleft) <= tol]
+    return df.iloc[rows]
+
+FIXEDWIDTHBLOCK = 100000 #number of rows formatted and written at a time by `dfWriteFixedWidth`
+FIXEDWIDTHVECTOR = 64 #minimum number of rows to format with numpy in `FixedWidthWriter` (python is faster for fewer)
+
 def dfWriteFixedWidth(df, savename, index=True, datatype='f', wid=16, prec=6,
                         writemode='w'):
     """Write dataframe to file with fixed-width format
@@ -529,25 +1666,10 @@ def dfWriteFixedWidth(df, savename, index=True, datatype='f', wid=16, prec=6,
     16 : 16 spaces reserved in column,
     .6 : 6 spaces reserved after decimal point,
     f  : float
-    """
-
-    #STOP PANDAS FROM COMPLAINING ABOUT CHANGING THE ORIGINAL DF
-    df = df.copy()
-
-    #SET STRING FORMATTING TYPE
-    def format_float(wid, val, prec):
-        #float formatting
-        return '{2:<{0}.{1}f}'.format(wid, prec, val)
-
-    def format_other(wid, val, prec=None):
-        #every other type formatting
-        return '{1:<{0}}'.format(wid, val)
-    #pointer for string formatting function
-    if datatype == 'f':
-        formatfunc = format_float
-    else:
-        formatfunc = format_other
 
+    Numeric data with float formatting is formatted with numpy array operations, otherwise rows are formatted
+    with one composed format statement per row (instead of per cell). Rows are written in blocks of `FIXEDWIDTHBLOCK`
+    """
 
     #GET COLUMN HEADERS
     cols = list(df.columns.values)
@@ -559,62 +1681,350 @@ def dfWriteFixedWidth(df, savename, index=True, datatype='f', wid=16, prec=6,
     else:
         #WRITE TO NEW FILE
         ofile = open(savename, 'w')
-
         #WRITE HEADER ROW
-        #first column is empty (full column spaces) if index, otherwise nothing
-        line = '{1:<{0}}'.format(wid, ' ') if index else ''
-        #concatenate column headers in fixed-width format
-        for c in cols:
-            #0 indicates 1st format entry goes in this {} (number of column spaces)
-            #1: indicates 2nd format entry goes in this {} (column name)
-            line += '{1:<{0}}'.format(wid, c)
-            # line += '{:<16}'.format(c)
-        #write header to file
-        ofile.write('{}\n'.format(line))
-
-    #WRITE EACH ROW (slightly faster version)
-    #start text of each row
-    if index:
-        # df['line'] = ['{1:<{0}}'.format(wid, str(i)) for i in df.index.values]
-        df['line'] = df.apply(lambda row: '{1:<{0}}'.format(wid, str(row.name)), axis = 1)
-    else:
-        df['line'] = ''
-    #rest of text for each row
-    df['line'] = df.apply(lambda row: row.line + ''.join([formatfunc(wid, row[c], prec) for c in cols]), axis = 1)
-
-    for line in df.line:
-        #write current data line to file
-        ofile.write('{}\n'.format(line))
-
-
-    # #WRITE EACH ROW
-    # for i, r in df.iterrows():
-    #     #first column is index if index, otherwise nothing
-    #     line = '{1:<{0}}'.format(wid, str(i)) if index else ''
-    #     # line = '{:<16}'.format(str(i)) if index else ''
-
-    #     # #concatenate row values in fixed-width format
-    #     # for c in cols:
-    #     #     line += formatfunc(wid, r[c], prec)
-
-    #     if datatype == 'f':
-    #         #float formatting
-    #         for c in cols:
-    #             line += '{2:<{0}.{1}f}'.format(wid, prec, r[c])
-    #             # line += '{:<16.6f}'.format(r[c])
-    #     else:
-    #         #every other type formatting
-    #         for c in cols:
-    #             line += '{1:<{0}}'.format(wid, r[c])
-    #             # line += '{:<16}'.format(r[c])
-
-    #     #write current data line to file
-    #     ofile.write('{}\n'.format(line))
+        ofile.write(_FixedWidthHeader(cols, index=index, wid=wid))
+
+    #WRITE ROWS IN BLOCKS
+    template = _FixedWidthTemplate(len(cols), index=index, datatype=datatype, wid=wid, prec=prec)
+    values = [_FixedWidthColumn(df.iloc[:, i]) for i in range(len(cols))]
+    labels = df.index if index else None
+    vectorized = _FixedWidthVectorized(values, datatype)
+    for start in range(0, len(df), FIXEDWIDTHBLOCK):
+        stop = min(start + FIXEDWIDTHBLOCK, len(df))
+        lines = _FixedWidthFloatLines(values, labels, start, stop, wid=wid, prec=prec) if vectorized else None
+        if lines is None: lines = _FixedWidthLines(template, values, labels, start, stop)
+        ofile.write(lines)
 
     #CLOSE FILE
     ofile.close()
 
-def ReadCdatFile2Pandas(path, nskip=None, hashspace=None):
+def _FixedWidthHeader(cols, index=True, wid=16):
+    """ Header row for fixed-width file (first column is empty if index)
+    """
+    #first column is empty (full column spaces) if index, otherwise nothing
+    line = '{1:<{0}}'.format(wid, ' ') if index else ''
+    #concatenate column headers in fixed-width format
+    for c in cols:
+        #0 indicates 1st format entry goes in this {} (number of column spaces)
+        #1: indicates 2nd format entry goes in this {} (column name)
+        line += '{1:<{0}}'.format(wid, c)
+    return '{}\n'.format(line)
+
+def _FixedWidthTemplate(ncol, index=True, datatype='f', wid=16, prec=6):
+    """ Format statement for a whole fixed-width row (index and `ncol` data columns, with newline)
+    """
+    #float formatting for 'f', every other type formatting otherwise
+    cell = '{{:<{}.{}f}}'.format(wid, prec) if datatype == 'f' else '{{:<{}}}'.format(wid)
+    return ('{{:<{}}}'.format(wid) if index else '') + cell * ncol + '\n'
+
+def _FixedWidthColumn(s):
+    """ Array of data in Series `s` for fixed-width formatting (numpy array if numeric, otherwise pandas array)
+    """
+    return s.values if isinstance(s.values, np.ndarray) and s.dtype.kind in 'biuf' else s.array
+
+def _FixedWidthVectorized(values, datatype='f'):
+    """ True if list of column arrays `values` can be formatted by numpy (numeric data with float formatting)
+    """
+    return datatype == 'f' and len(values) > 0 and all(isinstance(v, np.ndarray) and v.dtype.kind in 'biuf' for v in values)
+
+def _FixedWidthLines(template, values, labels, start, stop):
+    """ Text of rows `start:stop` of list of column arrays `values` (and index `labels`, if not None) formatted with `template`
+    """
+    #convert to python scalars (same values as formatting each cell of the dataframe)
+    cols = [v[start:stop].tolist() if isinstance(v, np.ndarray) and v.dtype.kind in 'biuf' else
+                list(np.asarray(v[start:stop], dtype=object)) for v in values]
+    if labels is not None: cols.insert(0, [str(i) for i in labels[start:stop]])
+    if not cols: return template * (stop - start)
+    return ''.join(map(template.format, *cols))
+
+def _FixedWidthFloatLines(values, labels, start, stop, wid=16, prec=6):
+    """ Same text as `_FixedWidthLines` for float formatting of numeric column arrays `values` (and index `labels`),
+    but formatted with numpy array operations instead of python. Returns None if it cant be (e.g. a value is wider than `wid`)
+    """
+    x = np.column_stack([v[start:stop] for v in values]).astype(np.float64)
+    chars = [_FixedFloatChars(x, wid, prec)]
+    if labels is not None:
+        labels = labels[start:stop]
+        if labels.dtype.kind in 'iu' and (len(labels) == 0 or np.abs(np.asarray(labels)).max() < 2**53):
+            #integer index (exact as floats, so 0 decimal float formatting is the same as `str`)
+            chars.insert(0, _FixedFloatChars(np.asarray(labels, dtype=np.float64)[:, None], wid, 0))
+        else:
+            strs = [str(i) for i in labels]
+            if not ''.join(strs).isascii(): return None
+            strs = np.array(strs, dtype='S')
+            if strs.dtype.itemsize > wid: return None
+            lab = np.full((len(strs), wid), 32, dtype=np.uint8)
+            lab[:, :strs.dtype.itemsize] = strs.view(np.uint8).reshape(len(strs), -1)
+            lab[lab == 0] = 32
+            chars.insert(0, lab)
+    if any(c is None for c in chars): return None
+    n = x.shape[0]
+    lines = np.concatenate([c.reshape(n, -1) for c in chars] + [np.full((n, 1), 10, dtype=np.uint8)], axis=1)
+    return lines.tobytes().decode('ascii')
+
+_POW10 = 10**np.arange(19, dtype=np.int64)
+
+def _FixedFloatChars(x, wid=16, prec=6):
+    """ Text of every value in float array `x` formatted as `'{:<wid.precf}'`, as characters (uint8 array with an extra
+    last axis of length `wid`). Returns None if any value is wider than `wid`.
+    Values are rounded to integer multiples of `10**-prec` and split into digits with numpy. The few values that python
+    could round differently (too close to halfway, too large, NaN/inf) are formatted by python instead
+    """
+    shape = x.shape
+    x = x.ravel()
+    if len(x) == 0: return np.empty(shape + (wid,), dtype=np.uint8)
+    m = x * 10.0**prec
+    r = np.rint(m)
+    #rounding matches python's exactly rounded decimal if the product is farther from halfway than its rounding error
+    #(rounding error is at most half of the spacing between floats, which is at most |m|*2**-52)
+    am = np.abs(m)
+    with np.errstate(invalid='ignore'):
+        exact = (am < 2.0**53) & (np.abs(np.abs(m - r) - 0.5) > am * 2.0**-52)
+    ipart, fpart = np.divmod(np.where(exact, np.abs(r), 0).astype(np.int64), _POW10[prec])
+    neg = np.signbit(x) & exact
+    #text length: sign, integer digits, decimal point and decimals
+    nint = np.maximum(np.searchsorted(_POW10, ipart, side='right'), 1)
+    nchar = neg + nint + (prec + 1 if prec > 0 else 0)
+    if (nchar > wid).any(): return None
+    nmax = int(nchar.max())
+
+    #right-aligned text, padded with zeros (decimals, decimal point, then integer digits), followed by a column of spaces
+    buf = np.full((len(x), nmax + wid), 32, dtype=np.uint8)
+    pos = nmax - 1
+    if prec > 0:
+        pos = _WriteDigits(buf, fpart, prec, pos)
+        buf[:, pos] = ord('.')
+        pos -= 1
+    _WriteDigits(buf, ipart, int(nint.max()), pos)
+
+    #left-align in column (take the column-wide window of each row that starts at its text)
+    windows = np.lib.stride_tricks.sliding_window_view(buf.ravel(), wid)
+    out = windows[np.arange(len(x)) * (nmax + wid) + (nmax - nchar)]
+    #leading zero padding is sign position for negatives
+    out[:, 0] = np.where(neg, ord('-'), out[:, 0])
+
+    #python formatting for the rest
+    for i in np.flatnonzero(~exact):
+        s = '{:<{}.{}f}'.format(float(x[i]), wid, prec)
+        if len(s) > wid: return None
+        out[i] = np.frombuffer(s.encode('ascii'), dtype=np.uint8)
+    return out.reshape(shape + (wid,))
+
+def _WriteDigits(buf, q, ndigit, pos):
+    """ Write last `ndigit` decimal digits of integer array `q` as characters in columns of `buf` ending at `pos`
+    Returns:
+        column before the digits
+    """
+    #(smaller ints divide faster)
+    q = q.astype(np.int32) if q.max() < 2**31 else q
+    for k in range(ndigit):
+        q, d = q // 10, q
+        buf[:, pos] = d - 10 * q + 48
+        pos -= 1
+    return pos
+
+class FixedWidthWriter():
+    """ Fixed-width file writer for appending many batches of rows (e.g. monitoring output written during a run).
+    Same file format as `dfWriteFixedWidth`, but the file is opened once, the row format is compiled once from
+    the header, and batches are buffered and written when the buffer is big (`flushsize`) or old (`flushtime`).
+    Writes any buffered rows on `Close` (or exit, when used as a context manager, or at garbage collection).
+
+    Usage:
+        with FixedWidthWriter('hist.dat', ['iter', 'time', 'cl']) as writer:
+            for i in range(niter):
+                writer.Write({'iter' : its, 'time' : times, 'cl' : cls})
+    """
+
+    def __init__(self, savename, cols=None, index=True, datatype='f', wid=16, prec=6,
+                    writemode='w', flushsize=2**20, flushtime=5.0):
+        """ Open file and write header
+        Args:
+            savename: path to file
+            cols: column headers [read from existing file header if appending, otherwise first batch]
+            index: write index (DataFrame index, or running row number for other batches, continuing
+                    from the number of data rows already in the file when appending) [True]
+            datatype: 'f' for float data, 's' for string data ['f']
+            wid: column width in spaces [16]
+            prec: decimal precision (number of decimal places for floats) [6]
+            writemode: 'w' to write new file, 'a' to append to existing file ['w']
+            flushsize: write to file when buffer has this many characters [2**20]
+            flushtime: write to file when oldest buffered batch is this many seconds old [5.0]
+        """
+        self.savename = savename
+        self.index = index
+        self.datatype = datatype
+        self.wid = wid
+        self.prec = prec
+        self.flushsize = flushsize
+        self.flushtime = flushtime
+        self.nrow = 0 #number of rows written
+        self.buffer = [] #formatted batches not yet written to file
+        self.nbuffer = 0 #number of characters in buffer
+        self.tbuffer = None #time of oldest batch in buffer
+
+        if writemode == 'a':
+            if os.path.isfile(savename) and os.path.getsize(savename) > 0:
+                #get columns from existing header
+                if cols is None:
+                    with open(savename) as f: cols = f.readline().split()
+                #row numbers continue after existing data rows (all lines after header)
+                with open(savename, 'rb') as f:
+                    self.nrow = sum(block.count(b'\n') for block in iter(lambda: f.read(2**20), b'')) - 1
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n': self.nrow += 1
+                self.nrow = max(self.nrow, 0)
+            self.ofile = open(savename, 'a')
+            self.header = False
+        else:
+            self.ofile = open(savename, 'w')
+            self.header = True
+        self.cols = None
+        if cols is not None: self._SetColumns(cols)
+        #write whatever is buffered if never closed
+        self._finalizer = weakref.finalize(self, _FlushClose, self.ofile, self.buffer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Close()
+
+    def _SetColumns(self, cols):
+        """ Compile row format for columns `cols` (and write header, if new file)
+        """
+        self.cols = list(cols)
+        self.template = _FixedWidthTemplate(len(self.cols), index=self.index, datatype=self.datatype, wid=self.wid, prec=self.prec)
+        if self.header: self._Buffer(_FixedWidthHeader(self.cols, index=self.index, wid=self.wid))
+
+    def _Buffer(self, text):
+        """ Add text to buffer
+        """
+        if not self.buffer: self.tbuffer = time.time()
+        self.buffer.append(text)
+        self.nbuffer += len(text)
+
+    def Write(self, data):
+        """ Format batch of rows and buffer them, writing buffer to file if it is big or old enough
+        Args:
+            data: DataFrame, dict of column arrays, or 2D array (rows, columns) of data in order of `cols`
+        """
+        if self.ofile.closed: raise ValueError("FixedWidthWriter `{}` is closed".format(self.savename))
+        if self.cols is None:
+            if isinstance(data, (pd.DataFrame, dict)):
+                self._SetColumns(list(data.keys()))
+            else:
+                raise ValueError("FixedWidthWriter needs `cols` to write array data")
+        #column arrays and index
+        if isinstance(data, pd.DataFrame):
+            values = [_FixedWidthColumn(data[c]) for c in self.cols]
+            labels = data.index
+        else:
+            if isinstance(data, dict):
+                values = [np.asarray(data[c]) for c in self.cols]
+            else:
+                data = np.asarray(data)
+                if data.ndim == 1: data = data[None, :]
+                if data.shape[1] != len(self.cols):
+                    raise ValueError("FixedWidthWriter got {} columns for {} headers".format(data.shape[1], len(self.cols)))
+                values = [data[:, i] for i in range(data.shape[1])]
+            labels = np.arange(self.nrow, self.nrow + (len(values[0]) if values else 0))
+        n = len(labels)
+        if not self.index: labels = None
+
+        lines = _FixedWidthFloatLines(values, labels, 0, n, wid=self.wid, prec=self.prec) \
+                    if n >= FIXEDWIDTHVECTOR and _FixedWidthVectorized(values, self.datatype) else None
+        if lines is None: lines = _FixedWidthLines(self.template, values, labels, 0, n)
+        self._Buffer(lines)
+        self.nrow += n
+
+        if self.nbuffer >= self.flushsize or time.time() - self.tbuffer >= self.flushtime: self.Flush()
+
+    def Flush(self):
+        """ Write buffer to file
+        """
+        _FlushClose(self.ofile, self.buffer, close=False)
+        self.nbuffer = 0
+
+    def Close(self):
+        """ Write buffer to file and close it
+        """
+        self.nbuffer = 0
+        self._finalizer()
+
+def _FlushClose(ofile, buffer, close=True):
+    """ Write and empty list of strings `buffer` to file `ofile`, and close it
+    """
+    if ofile.closed: return
+    ofile.write(''.join(buffer))
+    ofile.flush()
+    buffer.clear()
+    if close: ofile.close()
+
+def dfReadFixedWidth(path, cols=None, index=None, wid=16):
+    """ Read fixed-width file written by `dfWriteFixedWidth`/`FixedWidthWriter` into a dataframe.
+    Every column is sliced at its known width straight out of the memory-mapped file and converted by numpy
+    (no tokenizing), so only the selected columns are ever parsed.
+    Falls back to whitespace-delimited parsing if the rows aren't all the same width (e.g. a value overflowed `wid`).
+    An incomplete last row (file still being written) is ignored.
+    Args:
+        path: path to file
+        cols: list of columns to read [all]
+        index: file has index column. None detects it from a blank first header column [None]
+        wid: column width in spaces [16]
+    Returns:
+        dataframe of file data (numeric columns as floats, index as ints, anything else as strings)
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0: return pd.DataFrame(columns=cols)
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        #HEADER: first line, unless it is all numbers (blank index column header if index)
+        end = mm.find(b'\n')
+        first = mm[:end if end >= 0 else len(mm)].decode()
+        try:
+            [float(c) for c in first.split()]
+            header, start = None, 0
+        except ValueError:
+            header, start = first, end + 1
+        if index is None: index = header is not None and len(first) > wid and first[:wid].strip() == ''
+        keys = header.split() if header is not None else None
+
+        #ROW LAYOUT: every row is the same length, with the newline at its end
+        end = mm.find(b'\n', start)
+        if end < 0: return pd.DataFrame(columns=cols if cols is not None else keys)
+        rowlen = end - start + 1
+        ncell = (rowlen - 1) // wid
+        nrow = (len(mm) - start) // rowlen
+        if keys is None: keys = list(range(ncell - index))
+        newlines = np.ndarray((nrow,), dtype=np.uint8, buffer=mm, offset=end, strides=(rowlen,))
+        fixed = (rowlen - 1) % wid == 0 and ncell == len(keys) + index and (newlines == 10).all()
+        del newlines
+        if not fixed:
+            #not fixed-width: parse by whitespace
+            df = pd.read_csv(path, sep=r'\s+', header=None if header is None else 0, names=None if header is not None else keys,
+                                index_col=0 if index and header is None else None)
+            df.index.name = None
+            return df if cols is None else df[cols]
+
+        #COLUMNS: decode only requested columns
+        def Column(i):
+            #fixed-width strings of cell `i` of every row (view into file)
+            field = np.ndarray((nrow,), dtype='S{}'.format(wid), buffer=mm, offset=start + i * wid, strides=(rowlen,))
+            for dtype in ([np.int64] if i == 0 and index else []) + [np.float64]:
+                try:
+                    return field.astype(dtype)
+                except ValueError:
+                    pass
+            return np.char.strip(field.astype('U'))
+        if cols is None: cols = keys
+        position = {k : i + index for i, k in enumerate(keys)}
+        df = pd.DataFrame({c : Column(position[c]) for c in cols}, columns=cols)
+        if index: df.index = Column(0)
+    finally:
+        mm.close()
+    return df
+
+def ReadCdatFile2Pandas(path, nskip=None, hashspace=None, usecols=None, dtype=None, chunksize=None, cache=False):
     """Read cdat-format file file into a Pandas Dataframe.
     (Use nskip=-1, hashspace=False for overlst aero.dat)
     Args:
@@ -624,46 +2034,356 @@ def ReadCdatFile2Pandas(path, nskip=None, hashspace=None):
                     1 for jpowl,
                    -1 for automatic (standard cdat format) [Default]
         hashspace --> True if space between # and first header [True]
+        usecols --> list of columns to read, others are not converted [None (all)]
+        dtype --> data type of columns (e.g. 'float32' for half the memory) [None (inferred)]
+        chunksize --> return iterator of dataframes with this many rows instead of a dataframe,
+                        to stream through files larger than memory [None]
+        cache --> save parsed data to binary cache, and read from it next time (see `CachedRead`)
+                        True for default cache directory, 'sidecar' for next to file, or cache directory path.
+                        Cache has all columns, so first read parses all columns, not just `usecols` (not used with `chunksize`) [False]
+
+    Usage (end of run of a few columns of a large file):
+        chunks = ReadCdatFile2Pandas(path, usecols=['time', 'CL', 'CD'], dtype='float32', chunksize=10**6)
+        df = pd.concat(df[df['time'] >= 1000] for df in chunks)
     """
 
+    if cache and chunksize is None:
+        df = CachedRead(path, lambda p: ReadCdatFile2Pandas(p, nskip, hashspace), cache=cache,
+                            options='ReadCdatFile2Pandas {} {}'.format(nskip, hashspace))
+        if usecols is not None: df = df[[c for c in df.columns if c in usecols]]
+        if dtype is not None: df = df.astype(dtype)
+        return df
+
+    #GET COLUMN HEADERS (only reads the header lines)
+    nskip, keys = CdatHeader(path, nskip, hashspace)
+
+    #READ DATA
+        #data separated in fixed-width format
+        #stip 1st info row and 2nd header row
+        #supply header names manually
+        #(whitespace delimiter is handled by the C parser, pyarrow only does single-character delimiters)
+    df = pd.read_csv(path, skiprows=nskip, names=keys, sep=r'\s+', engine='c',
+                        usecols=usecols, dtype=dtype, chunksize=chunksize)
+
+    return df
+
+def CdatHeader(path, nskip=None, hashspace=None):
+    """ Find column headers of cdat-format file (see `ReadCdatFile2Pandas`), reading lines only until the data starts
+    Returns:
+        number of header rows to skip to reach data, list of column headers
+    """
     if nskip is None: nskip = -1
     # if hashspace is None or nskip == -1: hashspace = True #WHY DID I THINK HASHSPACE==TRUE FOR NSKIP=-1?
     if hashspace is None: hashspace = True
 
-
-    #GET COLUMN HEADERS
+    keys = ''
     with open(path) as f:
-        #Read file lines into list
-        content = f.readlines()
-        #strip newline \n characters
-        content = [x.strip() for x in content]
-        #Get column title keys from header row
         if nskip < 0:
             #Automatically find row with header keys, find 1st row with numbers
                 #Only works if header section is prepended with '#'
-            for i, l in enumerate(content):
-                if l[0] != '#':
+            for i, l in enumerate(f):
+                if l.strip()[:1] != '#':
                     #this is the first line of data, previous line was header
                     nskip = i
                     break
-        keys = content[nskip-1]
-        #split column titles by whitespace
-        keys = keys.split()
-        #drop leading '#'
-        if hashspace:
-            keys = keys[1:]
+                keys = l
         else:
-            keys[0] = keys[0].replace('#', '')
+            #header row is the row before the data
+            for i, l in zip(range(nskip), f): keys = l
+        if nskip == 0:
+            #no header rows, previous row wraps around to last row of file
+            for keys in f: pass
+    keys = keys.strip()
+    #split column titles by whitespace
+    keys = keys.split()
+    #drop leading '#'
+    if hashspace:
+        keys = keys[1:]
+    else:
+        keys[0] = keys[0].replace('#', '')
+    return nskip, keys
 
-    #READ DATA
-        #data separated in fixed-width format
-        #stip 1st info row and 2nd header row
-        #supply header names manually
-    # df = pd.read_fwf(path, skiprows=nskip, names=keys )
-    df = pd.read_csv(path, skiprows=nskip, names=keys, delim_whitespace=True)
+_CDATHEADERS = {} #cached `CdatHeader` results for `ReadTail`, by file and read options
+
+def _CachedCdatHeader(path, nskip=None, hashspace=None):
+    """ `CdatHeader` of file, reused while the file is the same, plus byte offset of data.
+    The file is the same if it has the same inode, isnt shorter than the header, and its header bytes are unchanged
+    (inodes are often reused when a file is deleted and recreated)
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    cachekey = (path, nskip, hashspace)
+    cached = _CDATHEADERS.get(cachekey)
+    if cached is not None and cached[0] == (stat.st_dev, stat.st_ino) and cached[1] <= stat.st_size:
+        with open(path, 'rb') as f:
+            if f.read(cached[1]) == cached[3]: return cached[1], cached[2]
+    nskip, keys = CdatHeader(path, nskip, hashspace)
+    with open(path, 'rb') as f:
+        if nskip < 0:
+            #no data yet, it will start at the end of the header
+            f.seek(0, os.SEEK_END)
+        for i in range(nskip): f.readline()
+        offset = f.tell()
+        f.seek(0)
+        header = f.read(offset)
+    #(header could still be incomplete if there is no data yet)
+    if nskip >= 0: _CDATHEADERS[cachekey] = ((stat.st_dev, stat.st_ino), offset, keys, header)
+    return offset, keys
+
+def ReadTail(path, nrows=1, nskip=None, hashspace=None, usecols=None, dtype=None, blocksize=2**16):
+    """ Read last `nrows` rows of cdat-format file (see `ReadCdatFile2Pandas`) without reading the rest of it.
+    Reads backward from the end of the file in blocks until it has enough complete lines, and only parses those.
+    Column headers are sniffed once per file and reused. An incomplete last line (file still being written) is ignored.
+    Args:
+        path: path to file
+        nrows: number of rows to read from end of file [1]
+        nskip, hashspace, usecols, dtype: see `ReadCdatFile2Pandas`
+        blocksize: size of first block to read, doubles until enough rows are found [2**16]
+    Returns:
+        dataframe of last rows (index is row number within returned rows)
+    """
+    start, keys = _CachedCdatHeader(path, nskip, hashspace)
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        tail = b''
+        while pos > start:
+            #read next block backward
+            n = min(blocksize, pos - start)
+            pos -= n
+            f.seek(pos)
+            tail = f.read(n) + tail
+            #need one extra newline to know the first of the last `nrows` lines is complete
+            if tail.count(b'\n') > nrows: break
+            blocksize *= 2
+    #first line may be partial (unless it is the first data line), last line may be incomplete (still being written)
+    if pos > start: tail = tail[tail.find(b'\n') + 1:]
+    tail = tail[:tail.rfind(b'\n') + 1]
+    #keep last `nrows` lines
+    ntail = tail.count(b'\n')
+    lines = tail.split(b'\n', ntail - nrows)[-1] if ntail > nrows else tail
+    if not lines.strip(): return pd.DataFrame(columns=usecols if usecols is not None else keys)
+    return pd.read_csv(io.BytesIO(lines), names=keys, sep=r'\s+', engine='c', usecols=usecols, dtype=dtype)
+
+class FileFollower():
+    """ Follow a cdat-format file that is being appended to (e.g. solver history during a run), parsing only the rows
+    appended since the last `Poll` into a columnar buffer (which grows geometrically, so appends are cheap).
+    Remembers the byte offset of the last complete row read, the file's inode and its header bytes. If the file is
+    truncated or replaced (e.g. restarted or rotated, even if rewritten past the last offset or the inode is reused),
+    its header is sniffed again and the whole file is re-read.
+
+    Usage:
+        follower = FileFollower('hist.dat', usecols=['time', 'CL'])
+        while running:
+            if follower.Poll(): plot(follower.DataFrame())
+            time.sleep(10)
+    """
+
+    def __init__(self, path, nskip=None, hashspace=None, usecols=None, dtype=None, capacity=1024):
+        """ Args:
+            path: path to file
+            nskip, hashspace, usecols, dtype: see `ReadCdatFile2Pandas`
+            capacity: initial number of rows in buffer [1024]
+        """
+        self.path = path
+        self.nskip = nskip
+        self.hashspace = hashspace
+        self.usecols = usecols
+        self.dtype = dtype
+        self.capacity = capacity
+        self.inode = None #(device, inode) of file being followed
+        self.offset = None #byte offset of end of last complete row read
+        self.header = None #bytes of file before data
+        self.keys = None #column headers
+        self.columns = None #column buffers, first `nrow` rows are data
+        self.nrow = 0
+
+    def Reset(self):
+        """ Forget everything read so far (next `Poll` reads the whole file)
+        """
+        self.inode = None
+        self.offset = None
+        self.header = None
+        self.columns = None
+        self.nrow = 0
+
+    def _Unchanged(self, stat):
+        """ File is still the one that was read so far: same inode, not shorter, same header bytes,
+        and the last row read still ends with a newline at the same place
+        """
+        if self.inode != (stat.st_dev, stat.st_ino) or stat.st_size < self.offset: return False
+        with open(self.path, 'rb') as f:
+            if f.read(len(self.header)) != self.header: return False
+            if self.offset > 0:
+                f.seek(self.offset - 1)
+                if f.read(1) != b'\n': return False
+        return True
+
+    def Poll(self):
+        """ Parse rows appended to file since last poll (whole file if first poll, or if truncated or replaced)
+        Returns:
+            number of new rows (0 if no complete rows were appended or the file doesnt exist yet)
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+        if self.inode is None or not self._Unchanged(stat):
+            #new, rotated or truncated file: start over
+            self.Reset()
+            self.offset, self.keys = _CachedCdatHeader(self.path, self.nskip, self.hashspace)
+            self.inode = (stat.st_dev, stat.st_ino)
+            with open(self.path, 'rb') as f:
+                self.header = f.read(self.offset)
+            if not self.keys:
+                #header isnt written yet
+                self.Reset()
+                return 0
+        if stat.st_size <= self.offset: return 0
+
+        #read new complete rows
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            new = f.read(stat.st_size - self.offset)
+        new = new[:new.rfind(b'\n') + 1]
+        if not new.strip():
+            self.offset += len(new)
+            return 0
+        df = pd.read_csv(io.BytesIO(new), names=self.keys, sep=r'\s+', engine='c', usecols=self.usecols, dtype=self.dtype)
+        self.offset += len(new)
+        self._Append(df)
+        return len(df)
+
+    def _Append(self, df):
+        """ Copy rows of dataframe to end of column buffers, growing them if they are full
+        """
+        n = len(df)
+        if self.columns is None:
+            self.columns = {c : np.empty(max(self.capacity, n), dtype=np.asarray(df[c].values).dtype) for c in df.columns}
+        for c, buf in self.columns.items():
+            new = np.asarray(df[c].values)
+            if self.nrow + n > len(buf) or np.result_type(new.dtype, buf.dtype) != buf.dtype:
+                #double capacity (or more, if needed), and upcast if new data needs a bigger type (e.g. int to float)
+                grown = np.empty(max(2 * len(buf), self.nrow + n), dtype=np.result_type(new.dtype, buf.dtype))
+                grown[:self.nrow] = buf[:self.nrow]
+                self.columns[c] = buf = grown
+            buf[self.nrow:self.nrow + n] = new
+        self.nrow += n
+
+    def DataFrame(self):
+        """ Dataframe of all rows read so far (view of buffers)
+        """
+        if self.columns is None: return pd.DataFrame(columns=self.usecols if self.usecols is not None else self.keys)
+        return pd.DataFrame({c : buf[:self.nrow] for c, buf in self.columns.items()}, copy=False)
+
+DATACACHEDIR = os.path.join(CACHEDIR, 'datacache') #default location of `CachedRead` binary caches of data files
+DATACACHESIZE = 10 * 2**30 #maximum total size of binary caches in a cache directory (bytes), least recently used are deleted first
+DATACACHESUFFIX = '.lutilcache.npz'
+
+def CachedRead(path, reader, cache=True, options=''):
+    """ Read data file with `reader`, through a binary cache so the text is only parsed once.
+    Parsed columns are saved as an uncompressed npz (one .npy per column), and later reads load that instead
+    (memory-mapped copy-on-write, so only the columns that are used are ever read from disk, and the frame can be
+    edited in place like a parsed one without changing the cache).
+    The cache is keyed on the file path and read options, and is re-parsed if the file size or modification time change.
+    Only cached if every column is numeric with a string label (and the default integer index), otherwise just returns `reader(path)`.
+    Args:
+        path: path to data file
+        reader: function that parses data file path into a dataframe
+        cache: True for cache directory `DATACACHEDIR`, 'sidecar' to save cache next to data file as a hidden file,
+                    or path to cache directory. False to just read [True]
+        options: string of any read options that change the parsed data, so they are cached separately ['']
+    Returns:
+        dataframe of file data
+    """
+    if not cache: return reader(path)
+
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    if cache == 'sidecar':
+        dirname, basename = os.path.split(path)
+        cachefile = os.path.join(dirname, '.{}.{}{}'.format(basename, hashlib.sha1(options.encode()).hexdigest()[:8], DATACACHESUFFIX))
+    else:
+        dirname = DATACACHEDIR if cache is True else cache
+        cachefile = os.path.join(dirname, '{}{}'.format(hashlib.sha1('{}\n{}'.format(path, options).encode()).hexdigest(), DATACACHESUFFIX))
+    meta = np.array([path, options, str(stat.st_size), str(stat.st_mtime_ns)])
 
+    #LOAD CACHE (if it is for the current version of the file)
+    try:
+        columns = _LoadNpzMemmap(cachefile, mode='c')
+        if np.array_equal(columns.pop('__meta__'), meta):
+            keys = columns.pop('__columns__').tolist()
+            #mark as recently used
+            os.utime(cachefile)
+            return pd.DataFrame({k : columns[str(i)] for i, k in enumerate(keys)}, columns=keys, copy=False)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        pass
+
+    #PARSE AND SAVE CACHE
+    df = reader(path)
+    if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1 \
+            or not all(isinstance(c, str) and isinstance(df[c].values, np.ndarray) and df[c].dtype.kind in 'biuf' for c in df.columns):
+        return df
+    try:
+        MakeOutputDir(cachefile)
+        #write to temporary file first, so a concurrent reader never sees a partial cache
+        tmpfile = '{}.{}.tmp.npz'.format(cachefile, os.getpid())
+        np.savez(tmpfile, __meta__=meta, __columns__=np.array(list(df.columns)),
+                    **{str(i) : df.iloc[:, i].values for i in range(df.shape[1])})
+        os.replace(tmpfile, cachefile)
+        if cache != 'sidecar': PruneDataCache(dirname)
+    except OSError:
+        #cache is a convenience, dont fail if it cant be written
+        pass
     return df
 
+def _LoadNpzMemmap(filename, mode='r'):
+    """ Load uncompressed npz file as dict of memory-mapped arrays (`np.load` reads npz members into memory)
+    Args:
+        mode: `np.memmap` mode, 'r' read-only or 'c' copy-on-write (writable, changes stay in memory) ['r']
+    """
+    arrays = {}
+    with zipfile.ZipFile(filename) as z, open(filename, 'rb') as f:
+        for info in z.infolist():
+            if info.compress_type != zipfile.ZIP_STORED: raise ValueError('compressed npz cant be memory-mapped')
+            #member data starts after its local file header (fixed 30 bytes, then name and extra field)
+            f.seek(info.header_offset + 26)
+            nname, nextra = np.frombuffer(f.read(4), dtype='<u2')
+            f.seek(info.header_offset + 30 + int(nname) + int(nextra))
+            version = np.lib.format.read_magic(f)
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f) if version == (1, 0) else np.lib.format.read_array_header_2_0(f)
+            name = info.filename[:-len('.npy')] if info.filename.endswith('.npy') else info.filename
+            if dtype.hasobject: raise ValueError('npz with objects cant be memory-mapped')
+            arrays[name] = np.memmap(filename, dtype=dtype, mode=mode, offset=f.tell(), shape=shape,
+                                        order='F' if fortran else 'C') if np.prod(shape) > 0 else np.empty(shape, dtype=dtype)
+    return arrays
+
+def PruneDataCache(cachedir=None, maxsize=None):
+    """ Delete least recently used binary data caches (see `CachedRead`) until their total size is below `maxsize`
+    Args:
+        cachedir: cache directory (or data directory with sidecar caches) [`DATACACHEDIR`]
+        maxsize: maximum total size of caches in bytes, 0 deletes all [`DATACACHESIZE`]
+    Returns:
+        number of bytes deleted
+    """
+    if cachedir is None: cachedir = DATACACHEDIR
+    if maxsize is None: maxsize = DATACACHESIZE
+    try:
+        entries = [(e.path, e.stat()) for e in os.scandir(cachedir) if e.name.endswith(DATACACHESUFFIX) and e.is_file()]
+    except OSError:
+        return 0
+    total = sum(s.st_size for _, s in entries)
+    deleted = 0
+    #least recently used first
+    for name, s in sorted(entries, key=lambda e: e[1].st_mtime):
+        if total - deleted <= maxsize: break
+        try:
+            os.remove(name)
+            deleted += s.st_size
+        except OSError:
+            pass
+    return deleted
+
 def SeriesToFile(s, filename):
     """How to write a pd.Series to a text file that can be read again as a series
     Must set header false since expected default is different from DataFrame defaul
@@ -697,6 +2417,89 @@ def SeriesFromFile(filename):
             s[i] = str2numeric(val)
     return s
 
+def SeriesFromFiles(paths, names=None, cache=None):
+    """ Read many `SeriesFromFile` files (e.g. run matrix metadata of every case) into one case x key dataframe.
+    All files are parsed together in one pass, then each key's type is inferred for all cases at once
+    (numeric if every value is, otherwise numbers, lists and strings like `SeriesFromFile`).
+    Args:
+        paths: list of files
+        names: case names for index [paths]
+        cache: path to consolidated cache of parsed files (pickle). Only files that are new or changed since the
+                    cache was saved are read, then cache is updated [None]
+    Returns:
+        dataframe with a row for each file and a column for each key (NaN if key isnt in a file)
+    """
+    paths = list(paths)
+    stats = {}
+    for p in paths:
+        s = os.stat(p)
+        stats[p] = (s.st_size, s.st_mtime_ns)
+
+    #CACHED FILES (keep rows of files that havent changed)
+    long = None
+    if cache is not None and os.path.isfile(cache):
+        try:
+            with open(cache, 'rb') as f:
+                saved = pickle.load(f)
+            long = saved['long'][saved['long']['case'].map(lambda p: saved['stats'].get(p) == stats.get(p))]
+        except (OSError, pickle.UnpicklingError, KeyError, EOFError):
+            long = None
+    cached = set() if long is None else set(long['case'])
+
+    #READ NEW FILES: parse all at once as (case, key, value) rows by prefixing every line with its case number
+    new = [p for p in paths if p not in cached]
+    if new:
+        texts = []
+        for i, p in enumerate(new):
+            with open(p) as f: texts.append(_LINESTART.sub('{},'.format(i), f.read().rstrip('\n')) + '\n')
+        df = pd.read_csv(io.StringIO(''.join(texts)), header=None, names=['case', 'key', 'value'], comment='#',
+                            dtype={'case':np.int64, 'key':str, 'value':str})
+        #(drop comment and blank lines, which only have a case number)
+        df = df.dropna(subset=['key'])
+        df['case'] = np.array(new, dtype=object)[df['case'].values]
+        long = df if long is None else pd.concat([long, df], ignore_index=True)
+        if cache is not None:
+            try:
+                MakeOutputDir(cache)
+                with open(cache, 'wb') as f:
+                    pickle.dump({'stats':stats, 'long':long}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except OSError:
+                pass
+    if long is None: long = pd.DataFrame(columns=['case', 'key', 'value'])
+
+    #CASE X KEY TABLE (keys in order of first appearance, last value of repeated keys)
+    long = long.drop_duplicates(['case', 'key'], keep='last')
+    table = long.set_index(['case', 'key'])['value'].unstack('key')
+    table = table.reindex(index=paths, columns=pd.unique(long['key']))
+    table.columns.name = None
+    table.index = paths if names is None else names
+
+    #INFER TYPE OF EACH KEY
+    return pd.DataFrame({k : _InferColumn(table[k]) for k in table.columns}, index=table.index, columns=table.columns)
+
+_LINESTART = re.compile(r'^', re.MULTILINE) #start of every line
+_INTEGER = re.compile(r'\s*[+-]?\d+\s*') #string `int` can convert
+
+def _InferColumn(s):
+    """ Convert Series of strings to numbers if they all are, otherwise convert items to numbers (int or float),
+    lists (of strings, for '[...]'), or leave as strings (like `SeriesFromFile`)
+    """
+    s = s.astype(object)
+    valid = s.notna()
+    num = pd.to_numeric(s, errors='coerce')
+    if num[valid].notna().all(): return num
+    out = s.copy()
+    #numbers (keep ints as ints)
+    isnum = num.notna()
+    isint = isnum & s.where(valid, '').str.fullmatch(_INTEGER)
+    out[isnum] = num[isnum].astype(object)
+    if isint.any(): out[isint] = pd.to_numeric(s[isint]).astype(object)
+    #lists (items will still be strings)
+    islist = valid & ~isnum & s.where(valid, '').str.startswith('[')
+    if islist.any():
+        out[islist] = s[islist].str.strip('][').str.replace("'", '', regex=False).str.split(', ')
+    return out
+
 def dfSafetyValve(df, targetsize=None, quiet=True):
     """ safety valve in case data sample frequency was too high and kills plotting
     df --> dataframe to down-sample
@@ -718,21 +2521,126 @@ def dfZeroSmallValues(df, tol=1e-16):
     df[abs(df) < tol] = 0
     return df
 
-def dfStats(df):
+STATSBLOCK = 2**14 #rows per block of single-pass statistics kernel (block stays in cache for all statistics)
+
+def _MergeMoments(a, b):
+    """ Combine two sets of (count, mean, M2, min, max) moments of the same columns (Chan et al. parallel update)
+    """
+    na, ma, m2a, mna, mxa = a
+    nb, mb, m2b, mnb, mxb = b
+    n = na + nb
+    with np.errstate(invalid='ignore', divide='ignore'):
+        f = np.where(n > 0, nb / n, 0)
+    delta = mb - ma
+    mean = ma + delta * f
+    m2 = m2a + m2b + delta * delta * na * f
+    return n, mean, m2, np.fmin(mna, mnb), np.fmax(mxa, mxb)
+
+def _SegmentMoments(X, starts):
+    """ (count, mean, M2, min, max) of each row segment of 2D array `X` beginning at rows `starts`, skipping NaN
+    """
+    lengths = np.diff(np.append(starts, len(X)))
+    if len(starts) == 1:
+        #whole block is one segment: plain reductions are faster than reduceat
+        reduce = lambda ufunc, A: ufunc.reduce(A, axis=0, keepdims=True)
+        expand = lambda A: A
+    else:
+        reduce = lambda ufunc, A: ufunc.reduceat(A, starts, axis=0)
+        expand = lambda A: np.repeat(A, lengths, axis=0)
+    Xz = X
+    s = reduce(np.add, X)
+    nan = np.isnan(X) if np.isnan(s).any() else None
+    if nan is None:
+        n = np.repeat(lengths.astype(X.dtype)[:,None], X.shape[1], axis=1)
+    else:
+        #zero out NaN so they drop out of the sums
+        n = reduce(np.add, ~nan).astype(X.dtype)
+        Xz = np.where(nan, 0, X)
+        s = reduce(np.add, Xz)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(n > 0, s / n, 0).astype(X.dtype)
+    D = Xz - expand(mean)
+    if nan is not None:
+        D[nan] = 0
+    m2 = reduce(np.add, D * D)
+    return n, mean, m2, reduce(np.fmin, X), reduce(np.fmax, X)
+
+def _Moments(X, starts=None, blocksize=None):
+    """ Single-pass (count, mean, M2, min, max) of every column of 2D array `X` for each group of rows beginning at
+    `starts`. Rows are processed in cache-sized blocks, with each block's moments merged into the group totals
+    """
+    blocksize = STATSBLOCK if blocksize is None else blocksize
+    starts = np.zeros(1, dtype=np.int64) if starts is None else np.asarray(starts, dtype=np.int64)
+    shape = (len(starts), X.shape[1])
+    acc = (np.zeros(shape, dtype=X.dtype), np.zeros(shape, dtype=X.dtype), np.zeros(shape, dtype=X.dtype),
+            np.full(shape, np.nan, dtype=X.dtype), np.full(shape, np.nan, dtype=X.dtype))
+    for r0 in range(0, len(X), blocksize):
+        r1 = min(r0 + blocksize, len(X))
+        #segments of this block: block start and any group starts inside block
+        i0 = np.searchsorted(starts, r0, side='right')
+        i1 = np.searchsorted(starts, r1, side='left')
+        segs = np.concatenate(([r0], starts[i0:i1]))
+        gids = np.searchsorted(starts, segs, side='right') - 1
+        block = _SegmentMoments(X[r0:r1], segs - r0)
+        merged = _MergeMoments(tuple(a[gids] for a in acc), block)
+        for a, m in zip(acc, merged):
+            a[gids] = m
+    return acc
+
+def _MomentStats(n, mean, m2, mn, mx):
+    """ [mean, std, min, max] from (count, mean, M2, min, max) moments (NaN where count is too small)
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return [np.where(n > 0, mean, np.nan), np.where(n > 1, np.sqrt(m2 / (n - 1)), np.nan), mn, mx]
+
+def dfStats(df, percentiles=None, rms=False, dtype=None, groupby=None):
     """ Compute the basic statistical parameters (mean, std, min, max) of a given dataframe
+    All statistics of the numeric columns come from a single blockwise pass over the data (non-numeric columns
+    are skipped). Labels are `key` for mean, then `key_std`, `key_min`, `key_max` (and `key_rms`, `key_p<q>`)
+    Args:
+        percentiles: list of percentiles (0-100) to also compute (e.g. [5, 95] --> `key_p5`, `key_p95`) [None]
+        rms: also compute root-mean-square of each column [False]
+        dtype: floating type to accumulate in (e.g. np.float32 halves memory traffic, at reduced precision) [np.float64]
+        groupby: key of case column. Stats of each case are computed together in the same pass and returned
+                    as a dataframe with one row per case (sorted), instead of a series [None]
     """
-    #get mean values
-    s = df.mean()
-    #get other statistics
-    stats = ['std', 'min', 'max']
-    for stat in stats:
-        #take the statistic of the time series
-        s1 = eval("df.{}()".format(stat))
-        #rename the columns for that statistic
-        s1.index = s1.index + "_" + stat
-        #combine with statistics series
-        s = pd.concat([s, s1])
-    return s
+    dtype = np.float64 if dtype is None else dtype
+    cols = [c for c in df.select_dtypes(include=np.number).columns if c != groupby]
+    X = df[cols].to_numpy(dtype=dtype)
+    if groupby is not None:
+        codes, cases = pd.factorize(df[groupby], sort=True)
+        if (codes < 0).any() or (np.diff(codes) < 0).any():
+            #sort rows by case so each case is a contiguous segment (radix sort for small integer codes)
+            order = np.argsort(codes.astype(np.int16) if len(cases) < 2**15 else codes, kind='stable')
+            order = order[codes[order] >= 0] #drop rows with no case
+            X = np.take(X, order, axis=0)
+            codes = codes[order]
+        starts = np.flatnonzero(np.diff(codes)) + 1
+        starts = np.concatenate(([0], starts)) if len(codes) > 0 else starts
+        cases = cases[codes[starts]]
+    else:
+        starts = np.zeros(1 if len(X) > 0 else 0, dtype=np.int64)
+    n, mean, m2, mn, mx = _Moments(X, starts)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stats = _MomentStats(n, mean, m2, mn, mx)
+        labels = [cols] + [['{}_{}'.format(c, stat) for c in cols] for stat in ['std', 'min', 'max']]
+        if rms:
+            stats.append(np.sqrt(mean*mean + m2 / n))
+            labels.append(['{}_rms'.format(c) for c in cols])
+    if percentiles is not None:
+        ends = np.append(starts[1:], len(X))
+        pct = np.nanpercentile if np.isnan(X).any() else np.percentile
+        p = np.array([pct(X[i0:i1], percentiles, axis=0) for i0, i1 in zip(starts, ends)]).reshape(
+                    len(starts), len(percentiles), len(cols))
+        for i, q in enumerate(percentiles):
+            stats.append(p[:,i])
+            labels.append(['{}_p{:g}'.format(c, q) for c in cols])
+    stats = np.concatenate(stats, axis=1)
+    labels = list(itertools.chain.from_iterable(labels))
+    if groupby is None:
+        return pd.Series(stats[0] if len(stats) > 0 else np.full(len(labels), np.nan, dtype=dtype), index=labels)
+    return pd.DataFrame(stats, index=pd.Index(cases, name=groupby), columns=labels)
 
 def dfStatsTimeseries(df, window=None, windowend=None, windowpar=None):
     """ Get average, st. dev., min/max of time series data OVER SPECIFIED INTERVAL FOR NOW
@@ -801,6 +2709,296 @@ def dfStatsTimeseries(df, window=None, windowend=None, windowpar=None):
 
     return s
 
+def _CompensatedCumsum(D):
+    """ Cumulative sums of the rows of 2D array `D` (with a leading row of zeros) and the rounding error of each
+    running sum (exact error of each addition by TwoSum, accumulated). Differences of long running sums would
+    otherwise lose the precision of short windows far into the history
+    """
+    S = np.zeros((len(D) + 1,) + D.shape[1:], order='F') #(column-major: each running sum is contiguous)
+    np.cumsum(D, axis=0, out=S[1:])
+    bb = S[1:] - S[:-1]
+    err = np.zeros_like(S)
+    np.cumsum((S[:-1] - (S[1:] - bb)) + (D - bb), axis=0, out=err[1:])
+    return S, err
+
+def _WindowSum(sums, i0, i1):
+    """ Sum of rows [i0, i1) from `_CompensatedCumsum` output
+    """
+    S, err = sums
+    return (S[i1] - S[i0]) + (err[i1] - err[i0])
+
+class _RangeTable():
+    """ Sparse table of the reductions (`np.fmin` or `np.fmax`, which skip NaN) of blocks of rows of a 2D array,
+    so the reduction over any range of rows is two table lookups plus partial blocks at either end: O(1) per range
+    Args:
+        X: 2D array (rows x columns)
+        ufunc: `np.fmin` or `np.fmax`
+        blocksize: rows per block. Table size is (number of blocks)*log2(number of blocks) rows [64]
+    """
+    def __init__(self, X, ufunc, blocksize=64):
+        self.X = X
+        self.ufunc = ufunc
+        self.blocksize = blocksize
+        blocks = ufunc.reduceat(X, np.arange(0, len(X), blocksize), axis=0) if len(X) > 0 else X[:0]
+        nlevel = max(int(len(blocks)).bit_length(), 1)
+        #level k: reduction of 2**k consecutive blocks starting at each block
+        self.table = np.full((nlevel,) + blocks.shape, np.nan, dtype=X.dtype)
+        self.table[0] = blocks
+        for k in range(1, nlevel):
+            h = 2**(k-1)
+            self.table[k,:len(blocks)-2*h+1] = ufunc(self.table[k-1,:len(blocks)-2*h+1], self.table[k-1,h:len(blocks)-h+1])
+
+    def _Partial(self, i0, i1):
+        """ Reduction of rows [i0, i1) with fewer than `blocksize` rows, for each range (NaN if empty)
+        """
+        idx = i0[:,None] + np.arange(self.blocksize)
+        vals = self.X[np.minimum(idx, len(self.X) - 1)]
+        vals[idx >= i1[:,None]] = np.nan
+        return self.ufunc.reduce(vals, axis=1)
+
+    def Query(self, i0, i1):
+        """ Reduction of rows [i0, i1) of each range (NaN if empty)
+        Args:
+            i0, i1: arrays of range start (inclusive) and end (exclusive) rows
+        """
+        if len(self.X) == 0:
+            return np.full((len(i0), self.X.shape[1]), np.nan)
+        b = self.blocksize
+        #full blocks [lo, hi) inside range, partial blocks before and after
+        lo, hi = -(-i0 // b), i1 // b
+        head = np.minimum(lo * b, i1)
+        out = self.ufunc(self._Partial(i0, head), self._Partial(np.maximum(hi * b, head), i1))
+        n = hi - lo
+        k = np.where(n > 0, np.floor(np.log2(np.maximum(n, 1))), 0).astype(np.int64)
+        full = self.ufunc(self.table[k, np.minimum(lo, len(self.table[0]) - 1)],
+                        self.table[k, np.clip(hi - 2**k, 0, len(self.table[0]) - 1)])
+        full[n <= 0] = np.nan
+        return self.ufunc(out, full)
+
+class WindowStats():
+    """ Mean, std, min/max of a time history over many averaging windows at once.
+    Cumulative sums of x and x**2 and sparse tables of running min/max are built once per history, then the
+    statistics of any window are O(1), so thousands of windows are evaluated in one vectorized call.
+    Windows inside the data match (and are labeled like) `dfStatsTimeseries` of the same window. Windows outside
+    the data or of zero length give NaN or single-row stats, instead of the whole-history fallback of `dfStatsTimeseries`
+    (where `dfSubset` skips a trim that would leave no rows).
+    Usage:
+        ws = WindowStats(df, windowpar='iter')
+        sweep = ws.Windows(window=[500, 1000, 2000], windowend=[5000, 10000]) #6 windows, one row each
+    Args:
+        df: time history dataframe (statistics of all numeric columns)
+        windowpar: time parameter to average over ['iter']
+        blocksize: rows per block of min/max sparse tables [64]
+    """
+    def __init__(self, df, windowpar=None, blocksize=64):
+        if windowpar is None:
+            windowpar = 'iter'
+        #Failure options if averaging window parameter isnt in dataset
+        if windowpar not in df:
+            if windowpar.lower() in df:
+                windowpar = windowpar.lower()
+            elif windowpar.upper() in df:
+                windowpar = windowpar.upper()
+            else:
+                raise ValueError("{} is not in time-series, can't set the averaging window with it".format(windowpar))
+        self.windowpar = windowpar
+
+        t = df[windowpar].values
+        self.cols = [c for c in df.select_dtypes(include=np.number).columns if c != windowpar]
+        X = df[self.cols].to_numpy(dtype=np.float64)
+        if not df[windowpar].is_monotonic_increasing:
+            order = np.argsort(t, kind='stable')
+            t, X = t[order], X[order]
+        X = np.asfortranarray(X)
+        self.t = t
+
+        #prefix sums of data shifted by its mean (limits cancellation in the variance), NaN dropped
+        self.shift = np.nan_to_num(np.nanmean(X, axis=0)) if len(X) > 0 else np.zeros(len(self.cols))
+        D = X - self.shift
+        nan = np.isnan(D)
+        self.count = None
+        if nan.any():
+            self.count = np.zeros((len(X) + 1, len(self.cols)))
+            np.cumsum(~nan, axis=0, out=self.count[1:])
+            D[nan] = 0
+        self.sum = _CompensatedCumsum(D)
+        self.sumsq = _CompensatedCumsum(D * D)
+        self.min = _RangeTable(X, np.fmin, blocksize)
+        self.max = _RangeTable(X, np.fmax, blocksize)
+
+    def Stats(self, windowstart, windowend):
+        """ Statistics of each window [`windowstart`, `windowend`] (inclusive), one row per window (NaN if it has no rows)
+        Labels follow `dfStats` (`key`, `key_std`, `key_min`, `key_max`)
+        """
+        windowstart, windowend = np.broadcast_arrays(np.atleast_1d(windowstart), np.atleast_1d(windowend))
+        i0 = np.searchsorted(self.t, windowstart, side='left')
+        i1 = np.searchsorted(self.t, windowend, side='right')
+        i1 = np.maximum(i0, i1)
+        n = (i1 - i0)[:,None] if self.count is None else self.count[i1] - self.count[i0]
+        s = _WindowSum(self.sum, i0, i1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = s / n
+            var = np.maximum(_WindowSum(self.sumsq, i0, i1) - s * mean, 0) / (n - 1)
+            std = np.where(n > 1, np.sqrt(var), np.nan)
+        stats = np.concatenate([self.shift + mean, std, self.min.Query(i0, i1), self.max.Query(i0, i1)], axis=1)
+        labels = self.cols + ['{}_{}'.format(c, stat) for stat in ['std', 'min', 'max'] for c in self.cols]
+        return pd.DataFrame(stats, columns=labels)
+
+    def Windows(self, window=None, windowend=None):
+        """ Statistics and averaging details of `dfStatsTimeseries` windows, one row per window.
+        Windows are set like `dfStatsTimeseries`. Lists of `window` and `windowend` evaluate every combination
+        of the two (use `Stats` for arbitrary start/end pairs). Windows with no rows are NaN and zero-length
+        windows are the stats of that row (not the whole history, see `WindowStats`)
+        Args:
+            window: averaging window size(s), bounded by `windowend` [1000]
+            windowend: end(s) of averaging window [end of series] (negative: start of forward window)
+        """
+        window = np.atleast_1d(1000 if window is None else window)
+        tmin, tmax = (self.t[0], self.t[-1]) if len(self.t) > 0 else (np.nan, np.nan)
+        windowend = np.atleast_1d(tmax if windowend is None else windowend)
+        window, windowend = [a.ravel() for a in np.meshgrid(window, windowend)]
+
+        #forward window from windowstart, clipped to end of data (same rules as `dfStatsTimeseries`)
+        fwd = windowend < 0
+        fstart = np.abs(windowend)
+        fclip = (window < 0) | (fstart + window > tmax)
+        #backward window from windowend, clipped to start of data
+        bclip = (window < 0) | (windowend - window < tmin)
+        windowstart = np.where(fwd, fstart, np.where(bclip, tmin, windowend - window))
+        windowend = np.where(fwd, np.where(fclip, tmax, fstart + window), windowend)
+        window = np.where(fwd & fclip, tmax - fstart, np.where(~fwd & bclip, windowend - tmin, window))
+
+        df = self.Stats(windowstart, windowend)
+        #tag with averaging details
+        df['windowpar'] = self.windowpar
+        df['window'] = window
+        df['windowstart'] = windowstart
+        df['windowend'] = windowend
+        return df
+
+class RunningStats():
+    """ Running mean, std, min/max of every column of a time history that arrives in batches of rows (e.g. a live
+    solver history), without keeping the history in memory. Batches are combined with Welford/Chan updates, so
+    the result matches `dfStatsTimeseries` over all rows seen (numeric columns, to rounding). Accumulators of
+    different parts of a history (e.g. read in parallel) can be merged, and the state can be saved to disk and
+    resumed later.
+
+    Usage:
+        stats = RunningStats(filename='hist.stats') #resumes from file if it exists
+        for chunk in ReadCdatFile2Pandas('hist.dat', chunksize=100000):
+            stats.Update(chunk)
+        stats.Save()
+        s = stats.Series()
+    """
+
+    def __init__(self, windowpar=None, cols=None, dtype=None, filename=None):
+        """ Args:
+            windowpar: time parameter whose range is reported as the averaging window ['iter']
+            cols: columns to accumulate [numeric columns of first batch, except `windowpar`]
+            dtype: floating type to accumulate in [np.float64]
+            filename: state file to resume from (if it exists) and `Save` to [None]
+        """
+        self.windowpar = 'iter' if windowpar is None else windowpar
+        self.cols = None if cols is None else list(cols)
+        self.dtype = np.float64 if dtype is None else dtype
+        self.filename = filename
+        self.moments = None #(count, mean, M2, min, max) of each column
+        self.windowstart = None #range of `windowpar` seen
+        self.windowend = None
+        if cols is not None:
+            self._Reset()
+        if filename is not None and os.path.exists(filename):
+            self.Load(filename)
+
+    def _Reset(self):
+        """ Empty moments for current columns
+        """
+        shape = (1, len(self.cols))
+        self.moments = (np.zeros(shape, dtype=self.dtype), np.zeros(shape, dtype=self.dtype),
+                        np.zeros(shape, dtype=self.dtype), np.full(shape, np.nan, dtype=self.dtype),
+                        np.full(shape, np.nan, dtype=self.dtype))
+
+    def Update(self, df):
+        """ Accumulate a batch of rows (dataframe). Columns missing from the batch count as NaN (skipped)
+        """
+        #Failure options if averaging window parameter isnt in dataset (same as `dfStatsTimeseries`)
+        if self.windowpar not in df:
+            if self.windowpar.lower() in df:
+                self.windowpar = self.windowpar.lower()
+            elif self.windowpar.upper() in df:
+                self.windowpar = self.windowpar.upper()
+            else:
+                raise ValueError("{} is not in time-series, can't set the averaging window with it".format(self.windowpar))
+        if self.cols is None:
+            self.cols = [c for c in df.select_dtypes(include=np.number).columns if c != self.windowpar]
+        if self.moments is None:
+            self._Reset()
+        if len(df) == 0: return self
+
+        X = df.reindex(columns=self.cols).to_numpy(dtype=self.dtype)
+        self.moments = _MergeMoments(self.moments, _Moments(X))
+        self._Extend(df[self.windowpar].min(), df[self.windowpar].max())
+        return self
+
+    def _Extend(self, windowstart, windowend):
+        """ Extend range of `windowpar` seen
+        """
+        self.windowstart = windowstart if self.windowstart is None else min(self.windowstart, windowstart)
+        self.windowend = windowend if self.windowend is None else max(self.windowend, windowend)
+
+    def Merge(self, other):
+        """ Combine with accumulator of other rows of the same history (parallel combine)
+        """
+        if other.moments is None: return self
+        if self.moments is None:
+            self.windowpar, self.cols = other.windowpar, list(other.cols)
+            self._Reset()
+        if other.windowpar != self.windowpar or other.cols != self.cols:
+            raise ValueError("Can't merge running stats of different columns or window parameter")
+        self.moments = _MergeMoments(self.moments, other.moments)
+        if other.windowstart is not None:
+            self._Extend(other.windowstart, other.windowend)
+        return self
+
+    def Series(self):
+        """ Statistics of all rows accumulated so far, in the layout of `dfStatsTimeseries`
+        (`key`, `key_std`, `key_min`, `key_max`, then `windowpar`, `window`, `windowstart`, `windowend`)
+        """
+        cols = [] if self.cols is None else self.cols
+        stats = _MomentStats(*self.moments) if self.moments is not None else []
+        labels = cols + ['{}_{}'.format(c, stat) for stat in ['std', 'min', 'max'] for c in cols]
+        s = pd.Series(np.concatenate(stats, axis=1)[0] if stats else [], index=labels, dtype=self.dtype)
+
+        #tag with averaging details
+        s['windowpar'] = self.windowpar
+        s['window'] = None if self.windowstart is None else self.windowend - self.windowstart
+        s['windowstart'] = self.windowstart
+        s['windowend'] = self.windowend
+        return s
+
+    def Save(self, filename=None):
+        """ Write state to file (pickle) [`filename` given at construction], to resume with `Load`
+        """
+        filename = self.filename if filename is None else filename
+        MakeOutputDir(filename)
+        #write to temporary file first, so an interrupted save never corrupts the previous state
+        tmpfile = '{}.{}.tmp'.format(filename, os.getpid())
+        with open(tmpfile, 'wb') as f:
+            pickle.dump({'windowpar':self.windowpar, 'cols':self.cols, 'moments':self.moments,
+                         'windowstart':self.windowstart, 'windowend':self.windowend}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpfile, filename)
+
+    def Load(self, filename):
+        """ Resume from state written by `Save` (replaces current state)
+        """
+        with open(filename, 'rb') as f:
+            saved = pickle.load(f)
+        self.windowpar, self.cols, self.moments = saved['windowpar'], saved['cols'], saved['moments']
+        self.windowstart, self.windowend = saved['windowstart'], saved['windowend']
+        if self.moments is not None:
+            self.dtype = self.moments[1].dtype
+        return self
+
 def dfPrint(df):
     """ Print all rows/columns of a dataframe
     """
@@ -1045,3 +3243,29 @@ def dfConnectTheDots(df,xkey,ykey):
         d['mindist'] = d.apply(lambda r: distance(row[xkey], row[ykey], r[xkey], r[ykey]), axis=1)
         inds.append(d.sort_values('mindist').index[0])
     return df.loc[inds]
+
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    #If called from commandline, manage caches
+
+    parser = argparse.ArgumentParser(description='lutil cache management')
+
+    parser.add_argument('command', type=str, choices=['prunecache'],
+            help="'prunecache': delete least recently used binary data caches (see `CachedRead`)"
+        )
+    parser.add_argument('-d', '--dir', type=str, default=DATACACHEDIR,
+            help="Cache directory (or data directory with sidecar caches) [{}]".format(DATACACHEDIR)
+        )
+    parser.add_argument('-s', '--size', type=float, default=DATACACHESIZE / 2**30,
+            help="Maximum total size of caches to keep in GB, 0 to delete all [{:g}]".format(DATACACHESIZE / 2**30)
+        )
+
+    args = parser.parse_args()
+
+    if args.command == 'prunecache':
+        deleted = PruneDataCache(args.dir, int(args.size * 2**30))
+        print('Deleted {:.3f}GB of caches from {}'.format(deleted / 2**30, args.dir))
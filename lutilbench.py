@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+"""LUTIL BENCHMARKS
+Time the optimized `lutil` routines against their original implementations on
+large synthetic datasets.
+
+USAGE:
+    Command-line: python lutilbench.py [benchmark ...] [-n N [N ...]]
+    (-h for list of benchmarks)
+"""
+
+import os
+import shutil
+import tempfile
+import tracemalloc
+from time import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from lutil import OrderedGlob, dfInterp, dfSubset, dfWriteFixedWidth, dfReadFixedWidth, ReadCdatFile2Pandas, dfStats, \
+                    dfStatsTimeseries, WindowStats, RunningStats
+
+def timer(func, *args, **kwargs):
+    """ Return output and wall time of `func(*args, **kwargs)`
+    """
+    t0 = time()
+    out = func(*args, **kwargs)
+    return out, time() - t0
+
+def MakeFileSeries(path, header, n, tail='', fmt='06d'):
+    """ Make `n` empty files named `header.NNNNNN.tail` in `path`
+    """
+    os.makedirs(path, exist_ok=True)
+    for i in range(n):
+        os.close(os.open(os.path.join(path, '{}.{:{}}{}'.format(header, i, fmt, tail)), os.O_CREAT | os.O_WRONLY))
+
+def BenchOrderedGlob(sizes):
+    """ Time `OrderedGlob` scandir engine vs original glob engine for a directory of `q.y0.NNNNNN.triq` files
+    """
+    print('\nOrderedGlob: q.y0.*.triq')
+    for n in sizes:
+        path = tempfile.mkdtemp(prefix='lutilbench_')
+        try:
+            MakeFileSeries(path, 'q.y0', n, tail='.triq')
+            gp = '{}/q.y0.*.triq'.format(path)
+            new, dtnew = timer(OrderedGlob, gp, engine='scandir')
+            old, dtold = timer(OrderedGlob, gp, engine='glob')
+            assert (new['match'].values == old['match'].values).all()
+            print('    n={:>8d}: glob {:8.3f}s, scandir {:8.3f}s ({:5.1f}x)'.format(n, dtold, dtnew, dtold/dtnew))
+        finally:
+            shutil.rmtree(path)
+
+def memtimer(func, *args, **kwargs):
+    """ Return output, wall time and peak traced memory (MB) of `func(*args, **kwargs)`
+    """
+    tracemalloc.start()
+    out, dt = timer(func, *args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return out, dt, peak
+
+def History(n, ncol=20, seed=0):
+    """ Synthetic time history with `n` rows and `ncol` data columns
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.standard_normal((n, ncol)), columns=['c{}'.format(i) for i in range(ncol)])
+    df.insert(0, 'time', np.cumsum(rng.random(n)))
+    df.insert(0, 'iter', np.arange(n))
+    return df
+
+def BenchDfInterp(sizes):
+    """ Time `dfInterp` numpy fast path vs original pandas reindex/interpolate
+    """
+    print('\ndfInterp: 20-column history onto n/10 points')
+    for n in sizes:
+        df = History(n)
+        vals = np.linspace(df['time'].iloc[0], df['time'].iloc[-1], n//10)
+        new, dtnew = timer(dfInterp, df, 'time', vals, engine='numpy')
+        old, dtold = timer(dfInterp, df, 'time', vals, engine='pandas')
+        assert np.allclose(new.values, old.values)
+        print('    n={:>8d}: pandas {:8.3f}s, numpy {:8.3f}s ({:5.1f}x)'.format(n, dtold, dtnew, dtold/dtnew))
+
+def BenchDfSubset(sizes):
+    """ Time `dfSubset` searchsorted slice vs boolean masks (unsorted path) for trimming and downsampling a history
+    """
+    print('\ndfSubset: trim 20-column history to middle half, every 2nd row')
+    for n in sizes:
+        df = History(n)
+        tmin, tmax = df['time'].iloc[n//4], df['time'].iloc[3*n//4]
+        old, dtold = timer(dfSubset, df, tmin, tmax, 2, issorted=False)
+        new, dtnew = timer(dfSubset, df, tmin, tmax, 2)
+        fast, dtfast = timer(dfSubset, df, tmin, tmax, 2, issorted=True)
+        assert new.equals(old) and fast.equals(old)
+        print('    n={:>8d}: mask {:8.3f}s, searchsorted {:8.3f}s ({:5.1f}x), presorted {:10.6f}s'.format(
+                    n, dtold, dtnew, dtold/dtnew, dtfast))
+
+def BenchWriteFixedWidth(sizes):
+    """ Throughput of `dfWriteFixedWidth` (MB/s of fixed-width text written)
+    """
+    print('\ndfWriteFixedWidth: 22-column history')
+    for n in sizes:
+        df = History(n)
+        path = tempfile.mkdtemp(prefix='lutilbench_')
+        try:
+            savename = os.path.join(path, 'hist.dat')
+            _, dt = timer(dfWriteFixedWidth, df, savename)
+            mb = os.path.getsize(savename) / 1e6
+            print('    n={:>8d}: {:8.1f}MB in {:8.3f}s ({:6.1f}MB/s)'.format(n, mb, dt, mb/dt))
+        finally:
+            shutil.rmtree(path)
+
+def BenchReadFixedWidth(sizes):
+    """ Time `dfReadFixedWidth` (all columns and 2 columns) vs whitespace-delimited `pd.read_csv`
+    """
+    print('\ndfReadFixedWidth: 22-column history')
+    for n in sizes:
+        df = History(n)
+        path = tempfile.mkdtemp(prefix='lutilbench_')
+        try:
+            savename = os.path.join(path, 'hist.dat')
+            dfWriteFixedWidth(df, savename)
+            old, dtold = timer(pd.read_csv, savename, sep=r'\s+')
+            new, dtnew = timer(dfReadFixedWidth, savename)
+            sub, dtsub = timer(dfReadFixedWidth, savename, cols=['time', 'c0'])
+            assert np.allclose(new.values, old.values, rtol=0, atol=1e-12)
+            print('    n={:>8d}: read_csv {:8.3f}s, fixed-width {:8.3f}s ({:5.1f}x), 2 columns {:8.3f}s ({:5.1f}x)'.format(
+                        n, dtold, dtnew, dtold/dtnew, dtsub, dtold/dtsub))
+        finally:
+            shutil.rmtree(path)
+
+def MakeCdat(savename, df):
+    """ Write dataframe to standard cdat-format file (commented header rows, whitespace-delimited data)
+    """
+    with open(savename, 'w') as f:
+        f.write('# {}\n# VARIABLES\n# {}\n'.format(os.path.basename(savename), ' '.join(df.columns)))
+    df.to_csv(savename, mode='a', sep=' ', header=False, index=False, float_format='%.8e')
+
+def ReadCdatReadlines(path):
+    """ Original `ReadCdatFile2Pandas`: find header in list of all lines of file, then parse file again
+    """
+    with open(path) as f:
+        content = [x.strip() for x in f.readlines()]
+        for i, l in enumerate(content):
+            if l[0] != '#':
+                nskip = i
+                break
+        keys = content[nskip-1].split()[1:]
+    return pd.read_csv(path, skiprows=nskip, names=keys, sep=r'\s+')
+
+def BenchReadCdat(sizes):
+    """ Time and peak memory of `ReadCdatFile2Pandas` with lazy header sniffing vs reading all lines for the header
+    """
+    print('\nReadCdatFile2Pandas: 22-column cdat')
+    for n in sizes:
+        df = History(n)
+        path = tempfile.mkdtemp(prefix='lutilbench_')
+        try:
+            savename = os.path.join(path, 'hist.cdat')
+            MakeCdat(savename, df)
+            old, dtold, memold = memtimer(ReadCdatReadlines, savename)
+            new, dtnew, memnew = memtimer(ReadCdatFile2Pandas, savename)
+            assert new.equals(old)
+            print('    n={:>8d}: readlines {:8.3f}s {:8.1f}MB, sniff {:8.3f}s {:8.1f}MB ({:5.1f}x faster, {:5.1f}x less memory)'.format(
+                        n, dtold, memold, dtnew, memnew, dtold/dtnew, memold/memnew))
+        finally:
+            shutil.rmtree(path)
+
+def StatsConcat(df):
+    """ Original `dfStats`: separate pass for each statistic, concatenating series
+    """
+    s = df.mean()
+    for stat in ['std', 'min', 'max']:
+        s1 = getattr(df, stat)()
+        s1.index = s1.index + "_" + stat
+        s = pd.concat([s, s1])
+    return s
+
+def BenchDfStats(sizes):
+    """ Time single-pass `dfStats` vs one pass per statistic, for a whole history and grouped by 100 cases
+    """
+    print('\ndfStats: 22-column history')
+    for n in sizes:
+        df = History(n)
+        old, dtold = timer(StatsConcat, df)
+        new, dtnew = timer(dfStats, df)
+        assert np.allclose(new.values, old.values)
+        df['case'] = np.arange(n) * 100 // n
+        gold, dtgold = timer(lambda d: pd.DataFrame({k: StatsConcat(g.drop('case', axis=1)) for k, g in d.groupby('case')}).T, df)
+        gnew, dtgnew = timer(dfStats, df, groupby='case')
+        assert np.allclose(gnew.values, gold.values)
+        print('    n={:>8d}: per-stat {:8.3f}s, single-pass {:8.3f}s ({:5.1f}x), 100 cases: {:8.3f}s, {:8.3f}s ({:5.1f}x)'.format(
+                    n, dtold, dtnew, dtold/dtnew, dtgold, dtgnew, dtgold/dtgnew))
+
+def CheckWindowStatsEdges():
+    """ Check documented `WindowStats` behavior for degenerate windows (50-row history, `iter` 100-149):
+    windows outside the data are NaN and zero-length windows are single-row stats
+    (where `dfStatsTimeseries` falls back to the whole history), other windows match `dfStatsTimeseries`
+    """
+    df = pd.DataFrame({'iter' : np.arange(100, 150), 'a' : np.arange(50.)})
+    ws = WindowStats(df)
+    #outside of data: (window, windowend)
+    for w, e in [(10, -5), (10, 200), (10, 90)]:
+        s = ws.Windows(w, e).iloc[0]
+        assert s[['a', 'a_std', 'a_min', 'a_max']].isna().all(), (w, e)
+    #zero length: single row
+    for w, e, row in [(5, 100, 0), (0, 130, 30)]:
+        s = ws.Windows(w, e).iloc[0]
+        assert s['a'] == s['a_min'] == s['a_max'] == row and np.isnan(s['a_std']), (w, e)
+    #inside data: same as `dfStatsTimeseries`
+    for w, e in [(10, 140), (10, -110), (-1, 149), (100, 120)]:
+        s = ws.Windows(w, e).iloc[0]
+        old = dfStatsTimeseries(df, window=w, windowend=e)
+        assert np.allclose(s.drop('windowpar').values.astype(float), old.drop('windowpar').values.astype(float)), (w, e)
+
+def BenchWindowStats(sizes):
+    """ Time `WindowStats` vs a `dfStatsTimeseries` call per window for a sweep of 100 averaging windows
+    """
+    print('\nWindowStats: 22-column history, 10 window sizes x 10 window ends')
+    CheckWindowStatsEdges()
+    for n in sizes:
+        df = History(n)
+        windows = np.linspace(n//100, n//2, 10).astype(int)
+        ends = np.linspace(n//2, n-1, 10).astype(int)
+        old, dtold = timer(lambda: pd.DataFrame([dfStatsTimeseries(df, window=w, windowend=e) for e in ends for w in windows]))
+        new, dtnew = timer(lambda: WindowStats(df).Windows(window=windows, windowend=ends))
+        assert np.allclose(new.drop('windowpar', axis=1).values.astype(float), old.drop('windowpar', axis=1).values.astype(float))
+        print('    n={:>8d}: per-window {:8.3f}s, prefix sums {:8.3f}s ({:5.1f}x)'.format(n, dtold, dtnew, dtold/dtnew))
+
+def BenchRunningStats(sizes):
+    """ Time and peak memory of `RunningStats` over batches of 10000 rows vs `dfStatsTimeseries` of the whole history
+    """
+    print('\nRunningStats: 22-column history in batches of 10000 rows')
+    for n in sizes:
+        df = History(n)
+        old, dtold, memold = memtimer(dfStatsTimeseries, df, window=-1)
+        def Stream():
+            stats = RunningStats()
+            for i in range(0, n, 10000):
+                stats.Update(df.iloc[i:i+10000])
+            return stats.Series()
+        new, dtnew, memnew = memtimer(Stream)
+        assert np.allclose(new.drop('windowpar').values.astype(float), old.drop('windowpar').values.astype(float))
+        print('    n={:>8d}: whole history {:8.3f}s {:8.1f}MB, running {:8.3f}s {:8.1f}MB'.format(
+                    n, dtold, memold, dtnew, memnew))
+
+BENCHMARKS = {
+    'orderedglob'     : BenchOrderedGlob,
+    'dfinterp'        : BenchDfInterp,
+    'dfsubset'        : BenchDfSubset,
+    'writefixedwidth' : BenchWriteFixedWidth,
+    'readfixedwidth'  : BenchReadFixedWidth,
+    'readcdat'        : BenchReadCdat,
+    'dfstats'         : BenchDfStats,
+    'windowstats'     : BenchWindowStats,
+    'runningstats'    : BenchRunningStats,
+}
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Benchmark optimized lutil routines against their originals')
+
+    parser.add_argument('benchmarks', type=str, nargs='*', #'*': zero or more arguments
+            help="Benchmarks to run [all]: {}".format(', '.join(BENCHMARKS)),
+            default=list(BENCHMARKS),
+        )
+    parser.add_argument('-n', '--sizes', metavar='N',
+            help="Problem sizes to benchmark [100000 1000000]",
+            default=[100000, 1000000], type=int, nargs='+',
+        )
+
+    args = parser.parse_args()
+
+    for b in args.benchmarks:
+        BENCHMARKS[b](args.sizes)
@@ -22,7 +22,7 @@ Provides:
 
 
 Dependencies:
-- mypylib: fileCleanUp, OrderedGlob, cmd
+- mypylib: fileCleanUp, OrderedGlob, FileSeries, cmd
 
 
 TODO:
@@ -42,7 +42,7 @@ import time
 import re
 
 from mypylib import fileCleanUp as fclean
-from mypylib.lutil import cmd, OrderedGlob
+from mypylib.lutil import cmd, OrderedGlob, FileSeries
 def cmdv(command): print(command, "\n", cmd(command)) #verbose cmd
 
 
@@ -270,11 +270,14 @@ def Archive_KeepLastN(globpattern, tarname, N=None, compress=False, retcmd=False
         N: number of files to keep out of the archive, starting with the latest [0]
     """
     if N is None: N = 0
-    files = OrderedGlob(globpattern)
+    if N <= 0:
+        #original behavior: every match is kept out of the archive, so nothing is archived (or deleted)
+        return Archive_Files([], tarname, compress=compress, retcmd=retcmd, verbose=verbose)
+    files = FileSeries(globpattern, engine='index')
     #in case of multiple header matches per iter, keep out by `match` instead of just index
-    keep = files['match'].drop_duplicates().iloc[-N:]
-    files = files[~files['match'].isin(keep)]
-    return Archive_Files(files['file'], tarname, compress=compress, retcmd=retcmd, verbose=verbose)
+    keep = files.last(N)
+    if len(keep) > 0: files = files.before(keep.match[0])
+    return Archive_Files(list(files.files), tarname, compress=compress, retcmd=retcmd, verbose=verbose)
 
 
 
@@ -354,12 +357,12 @@ def Tar_RollingSeries(ilastsave=None, tarname=None, headers=None, tail=None, fmt
     #add leading period to tail for globbing
     tailstr = "" if tail is None else ".{}".format(tail)
     #check that there are actually files to archive, otherwise, skip
-    if sum([ len(OrderedGlob("{}.*{}".format(h, tailstr))['match'].values) for h in headers ]) == 0:
+    if sum([ len(OrderedGlob("{}.*{}".format(h, tailstr), engine='index')['match'].values) for h in headers ]) == 0:
         if verbose: print("No `{}` files to archive, skipping".format( " ".join(["{}.*{}".format(h, tailstr) for h in headers ]) ))
         return
     #get current simulation lastiter
     if ilastsave is None:
-        ilastsave = max(OrderedGlob('{}.*{}'.format(headers[0], tailstr))['match'].values)
+        ilastsave = max(OrderedGlob('{}.*{}'.format(headers[0], tailstr), engine='index')['match'].values)
         # raise ValueError()
     if tarname is None: raise ValueError()
     if save_series_start is None: raise ValueError()
@@ -425,8 +428,8 @@ def Tar_RollingSeries(ilastsave=None, tarname=None, headers=None, tail=None, fmt
     #Create list of files to archive
     files = []
     for h in headers:
-        f = OrderedGlob('{}.*{}'.format(h, tailstr))
-        files.extend(f[f['match'] < iproductionstart]['file'])
+        f = FileSeries('{}.*{}'.format(h, tailstr), engine='index')
+        files.extend(f.before(iproductionstart).files)
 
     #Archive Files
     if len(files) > 0: #only tar if there are files to tar